@@ -146,7 +146,7 @@ def test_toolpath_optimizer():
             material_hardness="150 HB",
             feature_type="finish pocket"
         )
-        print(f"   ✓ Recommended: {mill_type.value}")
+        print(f"   ✓ Recommended: {mill_type.label}")
         
         # Test 4: HSM parameters
         print("\n4. High-Speed Machining Parameters:")
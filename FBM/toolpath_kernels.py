@@ -0,0 +1,88 @@
+"""
+Toolpath Kernels Module
+Scalar numeric kernels for the toolpath optimizer
+
+Pure-Python reference implementation. The same kernels exist in
+toolpath_kernels.pyx for optional AOT compilation with Cython
+(`cythonize -i toolpath_kernels.pyx` builds `_toolpath_kernels`);
+toolpath_optimizer prefers the compiled extension when present and
+falls back to this module otherwise.
+"""
+
+from typing import Tuple
+import math
+
+import numpy as np
+
+# Precomputed so the hot RPM formula is a multiply + divide instead of
+# a pi attribute lookup and an extra division per call
+_INV_PI_X_1000 = 1000.0 / math.pi
+
+
+def engage_core(tool_diameter: float, stepover: float,
+                depth_of_cut: float) -> Tuple[float, float, float, float]:
+    """
+    Core engagement math shared by scalar and compiled paths
+
+    Returns (engagement_angle, chip_thinning, force_factor, feed_adjustment)
+    """
+    if stepover >= tool_diameter:
+        engagement_angle = 180.0  # Full width cut
+    else:
+        # Arc cosine formula for engagement angle
+        engagement_angle = math.degrees(2 * math.asin(min(stepover / tool_diameter, 1.0)))
+
+    # Chip thinning factor (chips are thinner at lower engagement)
+    chip_thinning = math.sin(math.radians(engagement_angle / 2))
+
+    # Estimate cutting force (lower at lower engagement)
+    force_factor = (engagement_angle / 180.0) * (depth_of_cut / tool_diameter)
+
+    # Feed rate adjustment recommendation
+    if engagement_angle < 90:
+        feed_adjustment = 1.0 / chip_thinning  # Compensate for chip thinning
+    elif engagement_angle > 135:
+        feed_adjustment = 0.8  # Reduce feed at high engagement
+    else:
+        feed_adjustment = 1.0
+
+    return engagement_angle, chip_thinning, force_factor, feed_adjustment
+
+
+def hsm_core(base_cutting_speed: float, tool_diameter: float,
+             speed_multiplier: float) -> Tuple[float, float]:
+    """Returns (hsm_cutting_speed, hsm_rpm)"""
+    hsm_cutting_speed = base_cutting_speed * speed_multiplier
+    hsm_rpm = hsm_cutting_speed * _INV_PI_X_1000 / tool_diameter
+    return hsm_cutting_speed, hsm_rpm
+
+
+def stepdown_core(feature_depth: float, max_doc: float) -> np.ndarray:
+    """
+    Adaptive stepdown schedule: larger depths first, remainder last
+
+    Returns a preallocated float64 array of per-pass depths rounded to
+    2 decimals — no list growth, one vectorized rounding pass.
+    """
+    # math.ceil on the true quotient, matching the Cython kernel. Float
+    # floor division is fmod-based, not floor(a/b), so -(-a // b) can
+    # overshoot by one pass when the quotient is exact (e.g. 3.0 / 0.6).
+    num_passes = math.ceil(feature_depth / max_doc)
+
+    stepdowns = np.empty(num_passes, dtype=np.float64)
+    if num_passes == 0:
+        return stepdowns
+
+    remaining_depth = feature_depth
+
+    for i in range(num_passes - 1):
+        # Earlier passes use larger DoC
+        doc = min(max_doc * (1.0 - i * 0.1), remaining_depth)
+        stepdowns[i] = doc
+        remaining_depth -= doc
+
+    # Final pass uses whatever remains
+    stepdowns[num_passes - 1] = remaining_depth
+    np.round(stepdowns, 2, out=stepdowns)
+
+    return stepdowns
@@ -0,0 +1,76 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Cython build of the toolpath numeric kernels
+
+Optional: build in place with `cythonize -i toolpath_kernels.pyx`
+(rename the built module to _toolpath_kernels or build with
+`cythonize -i -o _toolpath_kernels toolpath_kernels.pyx`).
+toolpath_optimizer falls back to toolpath_kernels.py when this
+extension is absent, so the build step is never required.
+"""
+
+from libc.math cimport asin, sin, ceil, pi
+
+import numpy as np
+
+cdef double _INV_PI_X_1000 = 1000.0 / pi
+cdef double _DEG = 180.0 / pi
+cdef double _RAD = pi / 180.0
+
+
+cpdef tuple engage_core(double tool_diameter, double stepover, double depth_of_cut):
+    """Returns (engagement_angle, chip_thinning, force_factor, feed_adjustment)"""
+    cdef double engagement_angle, chip_thinning, force_factor, feed_adjustment, ratio
+
+    if stepover >= tool_diameter:
+        engagement_angle = 180.0
+    else:
+        ratio = stepover / tool_diameter
+        if ratio > 1.0:
+            ratio = 1.0
+        engagement_angle = _DEG * 2.0 * asin(ratio)
+
+    chip_thinning = sin(_RAD * engagement_angle / 2.0)
+    force_factor = (engagement_angle / 180.0) * (depth_of_cut / tool_diameter)
+
+    if engagement_angle < 90.0:
+        feed_adjustment = 1.0 / chip_thinning
+    elif engagement_angle > 135.0:
+        feed_adjustment = 0.8
+    else:
+        feed_adjustment = 1.0
+
+    return engagement_angle, chip_thinning, force_factor, feed_adjustment
+
+
+cpdef tuple hsm_core(double base_cutting_speed, double tool_diameter,
+                     double speed_multiplier):
+    """Returns (hsm_cutting_speed, hsm_rpm)"""
+    cdef double hsm_cutting_speed = base_cutting_speed * speed_multiplier
+    cdef double hsm_rpm = hsm_cutting_speed * _INV_PI_X_1000 / tool_diameter
+    return hsm_cutting_speed, hsm_rpm
+
+
+cpdef object stepdown_core(double feature_depth, double max_doc):
+    """Adaptive stepdown schedule: larger depths first, remainder last"""
+    cdef int num_passes = <int>ceil(feature_depth / max_doc)
+    cdef int i
+    cdef double doc, remaining_depth = feature_depth
+
+    stepdowns = np.empty(num_passes, dtype=np.float64)
+    if num_passes == 0:
+        return stepdowns
+
+    cdef double[::1] out = stepdowns
+
+    for i in range(num_passes - 1):
+        doc = max_doc * (1.0 - i * 0.1)
+        if doc > remaining_depth:
+            doc = remaining_depth
+        out[i] = doc
+        remaining_depth -= doc
+
+    out[num_passes - 1] = remaining_depth
+    np.round(stepdowns, 2, out=stepdowns)
+
+    return stepdowns
@@ -4,32 +4,80 @@ Advanced toolpath optimization strategies for FBM system
 """
 
 from typing import List, Dict, Tuple, Optional
+from collections import Counter
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 import math
+import textwrap
 
+import numpy as np
 
-class ToolpathStrategy(Enum):
-    """Advanced toolpath strategies"""
-    ZIGZAG = "Zigzag"
-    SPIRAL_IN = "Spiral Inward"
-    SPIRAL_OUT = "Spiral Outward"
-    ADAPTIVE = "Adaptive Clearing"
-    TROCHOIDAL = "Trochoidal Milling"
-    MORPHED_SPIRAL = "Morphed Spiral"
-    CONSTANT_ENGAGEMENT = "Constant Engagement"
-    ONE_WAY = "One-Way Cutting"
-    RASTER = "Raster Pattern"
+try:
+    # Optional Cython build of the numeric kernels (see toolpath_kernels.pyx)
+    from _toolpath_kernels import engage_core, hsm_core, stepdown_core
+except ImportError:
+    from toolpath_kernels import engage_core, hsm_core, stepdown_core
 
+# HSM (speed, feed) multipliers keyed on lowercase material substring
+_HSM_MULTIPLIERS = {
+    "aluminum": (3.0, 2.0),
+    "plastic": (3.0, 2.0),
+    "steel": (1.5, 1.3),
+}
+_HSM_DEFAULT_MULTIPLIERS = (2.0, 1.5)
 
-class MillingType(Enum):
-    """Milling direction"""
-    CLIMB = "Climb Milling"
-    CONVENTIONAL = "Conventional Milling"
-    MIXED = "Mixed"
 
+class ToolpathStrategy(IntEnum):
+    """Advanced toolpath strategies (IntEnum so hot comparisons are int compares)"""
+    ZIGZAG = 0
+    SPIRAL_IN = 1
+    SPIRAL_OUT = 2
+    ADAPTIVE = 3
+    TROCHOIDAL = 4
+    MORPHED_SPIRAL = 5
+    CONSTANT_ENGAGEMENT = 6
+    ONE_WAY = 7
+    RASTER = 8
 
-@dataclass
+    @property
+    def label(self) -> str:
+        """Human-readable strategy name"""
+        return _STRATEGY_LABELS[self]
+
+
+_STRATEGY_LABELS = {
+    ToolpathStrategy.ZIGZAG: "Zigzag",
+    ToolpathStrategy.SPIRAL_IN: "Spiral Inward",
+    ToolpathStrategy.SPIRAL_OUT: "Spiral Outward",
+    ToolpathStrategy.ADAPTIVE: "Adaptive Clearing",
+    ToolpathStrategy.TROCHOIDAL: "Trochoidal Milling",
+    ToolpathStrategy.MORPHED_SPIRAL: "Morphed Spiral",
+    ToolpathStrategy.CONSTANT_ENGAGEMENT: "Constant Engagement",
+    ToolpathStrategy.ONE_WAY: "One-Way Cutting",
+    ToolpathStrategy.RASTER: "Raster Pattern",
+}
+
+
+class MillingType(IntEnum):
+    """Milling direction (IntEnum so hot comparisons are int compares)"""
+    CLIMB = 0
+    CONVENTIONAL = 1
+    MIXED = 2
+
+    @property
+    def label(self) -> str:
+        """Human-readable milling direction name"""
+        return _MILLING_LABELS[self]
+
+
+_MILLING_LABELS = {
+    MillingType.CLIMB: "Climb Milling",
+    MillingType.CONVENTIONAL: "Conventional Milling",
+    MillingType.MIXED: "Mixed",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class ToolEngagement:
     """Tool engagement analysis"""
     engagement_angle: float  # degrees
@@ -40,7 +88,7 @@ class ToolEngagement:
     recommended_feed_adjustment: float  # multiplier
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RestMachiningArea:
     """Area left by previous operations"""
     area_id: int
@@ -58,6 +106,7 @@ class ToolpathOptimizer:
         self.MAX_ENGAGEMENT_ANGLE = 180.0  # degrees
         self.OPTIMAL_ENGAGEMENT_ANGLE = 90.0  # degrees for best tool life
         self.TROCHOIDAL_DIAMETER_RATIO = 0.15  # trochoidal loop diameter
+        self._compiled_pipelines = {}  # (tool diameter, hardness bucket) -> callable
         
     def analyze_tool_engagement(self, tool_diameter: float, 
                                 stepover: float, 
@@ -67,42 +116,59 @@ class ToolpathOptimizer:
         Analyze tool engagement conditions
         Returns engagement parameters and recommended adjustments
         """
-        # Calculate radial engagement
-        radial_engagement = stepover
-        radial_engagement_pct = (radial_engagement / tool_diameter) * 100
-        
-        # Calculate engagement angle
-        if radial_engagement >= tool_diameter:
-            engagement_angle = 180.0  # Full width cut
-        else:
-            # Arc cosine formula for engagement angle
-            engagement_angle = math.degrees(2 * math.asin(min(radial_engagement / (2 * (tool_diameter / 2)), 1.0)))
-        
-        # Chip thinning factor (chips are thinner at lower engagement)
-        chip_thinning = math.sin(math.radians(engagement_angle / 2))
-        
-        # Estimate cutting force (lower at lower engagement)
-        force_factor = (engagement_angle / 180.0) * (depth_of_cut / tool_diameter)
-        
-        # Feed rate adjustment recommendation
-        # Can increase feed at lower engagement due to reduced load
-        if engagement_angle < 90:
-            feed_adjustment = 1.0 / chip_thinning  # Compensate for chip thinning
-        elif engagement_angle > 135:
-            feed_adjustment = 0.8  # Reduce feed at high engagement
-        else:
-            feed_adjustment = 1.0
-        
+        engagement_angle, chip_thinning, force_factor, feed_adjustment = \
+            engage_core(tool_diameter, stepover, depth_of_cut)
+
         return ToolEngagement(
             engagement_angle=engagement_angle,
-            radial_depth=radial_engagement,
+            radial_depth=stepover,
             axial_depth=depth_of_cut,
             chip_thinning_factor=chip_thinning,
             cutting_force_factor=force_factor,
             recommended_feed_adjustment=feed_adjustment
         )
     
-    def recommend_milling_type(self, material_hardness: str, 
+    def analyze_tool_engagement_batch(self, tool_diameters: np.ndarray,
+                                      stepovers: np.ndarray,
+                                      depths_of_cut: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized engagement analysis for many cuts at once
+
+        Mirrors analyze_tool_engagement but evaluates the feed-adjustment
+        cascade branchlessly with np.select, so shuffled feature batches
+        do not pay for branch mispredictions. Returns a dict of arrays
+        keyed like the ToolEngagement fields.
+        """
+        tool_diameters = np.asarray(tool_diameters, dtype=np.float64)
+        stepovers = np.asarray(stepovers, dtype=np.float64)
+        depths_of_cut = np.asarray(depths_of_cut, dtype=np.float64)
+
+        engagement_angle = np.where(
+            stepovers >= tool_diameters,
+            180.0,
+            np.degrees(2 * np.arcsin(np.minimum(stepovers / tool_diameters, 1.0)))
+        )
+        chip_thinning = np.sin(np.radians(engagement_angle / 2))
+        force_factor = (engagement_angle / 180.0) * (depths_of_cut / tool_diameters)
+
+        # Branchless equivalent of the <90 / >135 / else cascade
+        with np.errstate(divide='ignore'):
+            feed_adjustment = np.select(
+                [engagement_angle < 90, engagement_angle > 135],
+                [1.0 / chip_thinning, np.full_like(engagement_angle, 0.8)],
+                default=1.0
+            )
+
+        return {
+            'engagement_angle': engagement_angle,
+            'radial_depth': stepovers,
+            'axial_depth': depths_of_cut,
+            'chip_thinning_factor': chip_thinning,
+            'cutting_force_factor': force_factor,
+            'recommended_feed_adjustment': feed_adjustment
+        }
+
+    def recommend_milling_type(self, material_hardness: str,
                                feature_type: str,
                                tool_rigidity: str = "standard") -> MillingType:
         """
@@ -176,6 +242,33 @@ class ToolpathOptimizer:
             "notes": "Trochoidal milling reduces tool deflection and heat"
         }
     
+    def calculate_trochoidal_parameters_batch(self, slot_widths: np.ndarray,
+                                              tool_diameters: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Closed-form vectorized trochoidal parameters for many slots
+
+        Every output is a pure multiply (or np.where select) on the two
+        input arrays, so one call replaces N scalar calls and their
+        per-call dict allocations. Returns a SoA dict of ndarrays.
+        """
+        slot_widths = np.asarray(slot_widths, dtype=np.float64)
+        tool_diameters = np.asarray(tool_diameters, dtype=np.float64)
+        ratio = self.TROCHOIDAL_DIAMETER_RATIO
+
+        loop_diameter = tool_diameters * ratio
+        # Narrow slots get small forward steps, wider slots larger ones
+        step_forward = np.where(slot_widths < tool_diameters * 1.2,
+                                tool_diameters * 0.1,
+                                tool_diameters * 0.3)
+
+        return {
+            "loop_diameter": loop_diameter,
+            "step_forward": step_forward,
+            "engagement_width": loop_diameter,
+            "feed_multiplier": np.full_like(loop_diameter, 1.5),
+            "loops_per_mm": 1.0 / step_forward
+        }
+
     def detect_rest_machining_areas(self, feature_geometry: Dict,
                                     previous_operations: List) -> List[RestMachiningArea]:
         """
@@ -189,48 +282,83 @@ class ToolpathOptimizer:
         # Simple heuristic: if current feature is smaller than previous tool
         # there will be rest material in corners
         
-        if not previous_operations:
+        if len(previous_operations) == 0:
             return rest_areas
         
-        # Get smallest previous tool used
-        previous_tool_sizes = [op.tool_diameter for op in previous_operations 
-                              if hasattr(op, 'tool_diameter')]
-        
-        if not previous_tool_sizes:
-            return rest_areas
-        
-        min_previous_tool = min(previous_tool_sizes)
-        
+        # Get smallest previous tool used. Pipelines that store operations
+        # as a structured array get a single SIMD reduction; the object
+        # path keeps the materialized list so min() runs at C level
+        if isinstance(previous_operations, np.ndarray):
+            min_previous_tool = float(np.min(previous_operations['tool_diameter']))
+        else:
+            previous_tool_sizes = [op.tool_diameter for op in previous_operations
+                                   if hasattr(op, 'tool_diameter')]
+
+            if not previous_tool_sizes:
+                return rest_areas
+
+            min_previous_tool = min(previous_tool_sizes)
+
         # Estimate rest material in corners
         # For rectangular pockets, corners will have radius = previous tool radius
         if 'width' in feature_geometry and 'length' in feature_geometry:
-            width = feature_geometry.get('width', 0)
-            length = feature_geometry.get('length', 0)
-            
-            # Each corner has rest material
-            corner_radius = min_previous_tool / 2
-            remaining_stock = corner_radius
-            
-            # Create rest areas for each corner
-            corners = [
-                (-width/2 + corner_radius, -length/2 + corner_radius),
-                (width/2 - corner_radius, -length/2 + corner_radius),
-                (-width/2 + corner_radius, length/2 - corner_radius),
-                (width/2 - corner_radius, length/2 - corner_radius)
-            ]
-            
-            for i, (x, y) in enumerate(corners):
+            batch = self.detect_rest_machining_areas_batch(
+                widths=np.array([feature_geometry.get('width', 0)], dtype=np.float64),
+                lengths=np.array([feature_geometry.get('length', 0)], dtype=np.float64),
+                min_prev_tools=np.array([min_previous_tool], dtype=np.float64)
+            )
+
+            # Materialize dataclasses only at the API boundary
+            for i in range(4):
                 rest_area = RestMachiningArea(
                     area_id=i,
                     previous_tool_diameter=min_previous_tool,
-                    remaining_stock=remaining_stock,
-                    location=(x, y, 0),
-                    size=(corner_radius * 2, corner_radius * 2),
+                    remaining_stock=float(batch['remaining_stock'][0]),
+                    location=(float(batch['x'][0, i]), float(batch['y'][0, i]), 0),
+                    size=(float(batch['size'][0]), float(batch['size'][0])),
                     accessible_from_top=True
                 )
                 rest_areas.append(rest_area)
-        
+
         return rest_areas
+
+    def detect_rest_machining_areas_batch(self, widths: np.ndarray,
+                                          lengths: np.ndarray,
+                                          min_prev_tools: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized rest-area detection for many features at once
+
+        Structure-of-arrays variant: instead of allocating four
+        RestMachiningArea objects per feature, corner coordinates for all
+        N features are computed with broadcasting. Returns a dict of
+        arrays where 'x' and 'y' have shape (N, 4) — one column per
+        pocket corner — and 'size', 'remaining_stock' and 'prev_tool'
+        have shape (N,).
+        """
+        corner_radius = min_prev_tools / 2
+        half_width = widths / 2
+        half_length = lengths / 2
+
+        x = np.stack([
+            -half_width + corner_radius,
+            half_width - corner_radius,
+            -half_width + corner_radius,
+            half_width - corner_radius
+        ], axis=1)
+        y = np.stack([
+            -half_length + corner_radius,
+            -half_length + corner_radius,
+            half_length - corner_radius,
+            half_length - corner_radius
+        ], axis=1)
+
+        return {
+            'x': x,
+            'y': y,
+            'size': corner_radius * 2,
+            'remaining_stock': corner_radius,
+            'prev_tool': min_prev_tools
+        }
     
     def optimize_tool_sequence(self, required_tools: List[Tuple[str, float]],
                               minimize_changes: bool = True) -> List[Tuple[str, float]]:
@@ -244,18 +372,13 @@ class ToolpathOptimizer:
         """
         if not minimize_changes:
             return required_tools
-        
-        # Group by tool type and diameter
-        tool_groups = {}
-        for tool_type, diameter in required_tools:
-            key = (tool_type, diameter)
-            tool_groups[key] = tool_groups.get(key, 0) + 1
-        
-        # Sort by frequency (most used first) then by diameter (large to small)
-        optimized = sorted(tool_groups.keys(), 
-                          key=lambda x: (-tool_groups[x], -x[1]))
-        
-        return optimized
+
+        # Count duplicates in C via Counter, then sort by frequency
+        # (most used first) and diameter (large to small)
+        tool_counts = Counter(required_tools).most_common()
+        tool_counts.sort(key=lambda item: (-item[1], -item[0][1]))
+
+        return [tool for tool, _ in tool_counts]
     
     def calculate_air_time_reduction(self, operations: List) -> Dict:
         """
@@ -270,14 +393,10 @@ class ToolpathOptimizer:
             return {}
         
         # Calculate total rapid move distance (simplified)
-        total_rapids = 0
-        cutting_time = 0
-        
-        for op in operations:
-            if hasattr(op, 'estimated_time'):
-                cutting_time += op.estimated_time
-            # Estimate rapid moves between operations (simplified)
-            total_rapids += 2.0  # Approach + retract per operation
+        # getattr with a default avoids the per-op hasattr probe
+        cutting_time = sum(getattr(op, 'estimated_time', 0.0) for op in operations)
+        # Approach + retract per operation (simplified)
+        total_rapids = 2.0 * len(operations)
         
         # Estimate rapid time (assume 5000 mm/min rapid rate)
         rapid_time = total_rapids  # minutes (simplified)
@@ -299,7 +418,7 @@ class ToolpathOptimizer:
     
     def recommend_adaptive_stepdown(self, material_hardness: str,
                                     tool_diameter: float,
-                                    feature_depth: float) -> List[float]:
+                                    feature_depth: float) -> np.ndarray:
         """
         Calculate adaptive depth of cut for multi-pass operations
         
@@ -308,34 +427,75 @@ class ToolpathOptimizer:
         - Smaller depths as approaching final depth
         - Considers material and tool size
         """
-        # Base DoC on tool diameter
-        max_doc = tool_diameter * 0.5
-        min_doc = tool_diameter * 0.1
-        
-        # Adjust for material hardness
-        if "HRC" in material_hardness:
-            max_doc *= 0.6  # Reduce for hard materials
-        
-        # Calculate number of passes needed
-        num_passes = math.ceil(feature_depth / max_doc)
-        
-        # Generate adaptive stepdown schedule
-        stepdowns = []
-        remaining_depth = feature_depth
-        
-        for i in range(num_passes):
-            if i < num_passes - 1:
-                # Earlier passes use larger DoC
-                doc = min(max_doc * (1.0 - i * 0.1), remaining_depth)
-            else:
-                # Final pass uses whatever remains
-                doc = remaining_depth
-            
-            stepdowns.append(round(doc, 2))
-            remaining_depth -= doc
-        
-        return stepdowns
+        # Base DoC on tool diameter, reduced for hard materials
+        max_doc = tool_diameter * 0.5 * (0.6 if "HRC" in material_hardness else 1.0)
+
+        return stepdown_core(feature_depth, max_doc)
     
+    def compile_pipeline(self, tool_diameter: float, material_hardness: str):
+        """
+        Specialize the engagement -> milling -> stepdown sequence for one tool
+
+        Pipelines often run the same tool and material across thousands of
+        features. This generates (via exec) a function with the
+        tool-dependent constants folded in — no material branch, no
+        attribute lookups, division replaced by multiplies — and caches it
+        keyed on (tool diameter, hardness bucket).
+
+        Returns a callable (stepover, depth_of_cut, feature_depth) -> dict.
+        """
+        # Two hardness predicates get folded in: max_doc uses the HRC-only
+        # check (matching recommend_adaptive_stepdown), while the milling
+        # type also treats "hardened" materials as hard. Both go into the
+        # cache key so e.g. "hardened steel" and "45 HRC" don't collide.
+        is_hrc = "HRC" in material_hardness
+        is_hard = is_hrc or "hardened" in material_hardness.lower()
+        key = (round(tool_diameter, 6), is_hrc, is_hard)
+        pipeline = self._compiled_pipelines.get(key)
+        if pipeline is not None:
+            return pipeline
+
+        inv_td = 1.0 / tool_diameter
+        max_doc = tool_diameter * 0.5 * (0.6 if is_hrc else 1.0)
+        milling_type = self.recommend_milling_type(material_hardness, "")
+
+        source = textwrap.dedent(f"""
+            def _pipeline(stepover, depth_of_cut, feature_depth,
+                          _asin=_asin, _sin=_sin, _stepdown_core=_stepdown_core,
+                          _milling_type=_milling_type):
+                ratio = stepover * {inv_td!r}
+                if ratio >= 1.0:
+                    engagement_angle = 180.0
+                else:
+                    engagement_angle = 114.59155902616465 * _asin(ratio)
+                chip_thinning = _sin(0.008726646259971648 * engagement_angle)
+                if engagement_angle < 90.0:
+                    feed_adjustment = 1.0 / chip_thinning
+                elif engagement_angle > 135.0:
+                    feed_adjustment = 0.8
+                else:
+                    feed_adjustment = 1.0
+                return {{
+                    'engagement_angle': engagement_angle,
+                    'chip_thinning_factor': chip_thinning,
+                    'cutting_force_factor': engagement_angle * {inv_td / 180.0!r} * depth_of_cut,
+                    'recommended_feed_adjustment': feed_adjustment,
+                    'milling_type': _milling_type,
+                    'stepdowns': _stepdown_core(feature_depth, {max_doc!r}),
+                }}
+        """)
+        namespace = {
+            '_asin': math.asin,
+            '_sin': math.sin,
+            '_stepdown_core': stepdown_core,
+            '_milling_type': milling_type,
+        }
+        exec(source, namespace)
+
+        pipeline = namespace['_pipeline']
+        self._compiled_pipelines[key] = pipeline
+        return pipeline
+
     def calculate_high_speed_parameters(self, base_cutting_speed: float,
                                        tool_diameter: float,
                                        material: str) -> Dict:
@@ -349,20 +509,15 @@ class ToolpathOptimizer:
         - Adaptive toolpaths
         """
         # HSM typically 2-4x conventional speeds for soft materials
-        if "aluminum" in material.lower() or "plastic" in material.lower():
-            hsm_speed_multiplier = 3.0
-            hsm_feed_multiplier = 2.0
-        elif "steel" in material.lower():
-            hsm_speed_multiplier = 1.5
-            hsm_feed_multiplier = 1.3
-        else:
-            hsm_speed_multiplier = 2.0
-            hsm_feed_multiplier = 1.5
-        
-        hsm_cutting_speed = base_cutting_speed * hsm_speed_multiplier
-        
-        # Calculate HSM spindle speed
-        hsm_rpm = (hsm_cutting_speed * 1000) / (math.pi * tool_diameter)
+        material_lower = material.lower()
+        hsm_speed_multiplier, hsm_feed_multiplier = _HSM_DEFAULT_MULTIPLIERS
+        for keyword, multipliers in _HSM_MULTIPLIERS.items():
+            if keyword in material_lower:
+                hsm_speed_multiplier, hsm_feed_multiplier = multipliers
+                break
+
+        hsm_cutting_speed, hsm_rpm = hsm_core(base_cutting_speed, tool_diameter,
+                                              hsm_speed_multiplier)
         
         return {
             "cutting_speed": hsm_cutting_speed,
@@ -5,26 +5,126 @@ Visualization Module
 
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
+import functools
+import io
 import math
 
+import numpy as np
+
+
+@functools.lru_cache(maxsize=64)
+def _disk_mask(radius: int) -> np.ndarray:
+    """Boolean disk of shape (2r+1, 2r+1), memoized per radius"""
+    dy, dx = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+    return dx * dx + dy * dy <= radius * radius
+
+
+@dataclass(slots=True)
+class ToolpathFrame:
+    """One frame of the toolpath animation"""
+    operation_number: int
+    operation_name: str
+    tool: str
+    path_segments: List[Dict]
+    cutting_time: float
+
+    def to_dict(self) -> Dict:
+        """Dict form for JSON serialization boundaries"""
+        return {
+            'operation_number': self.operation_number,
+            'operation_name': self.operation_name,
+            'tool': self.tool,
+            'path_segments': self.path_segments,
+            'cutting_time': self.cutting_time,
+        }
+
+
+def _enum_value(value) -> str:
+    """Display string for an enum member or plain value, via one getattr"""
+    enum_value = getattr(value, 'value', None)
+    return enum_value if enum_value is not None else str(value)
+
+
+def _snapshot_feature(feature) -> Dict:
+    """
+    One-shot attribute extraction for the per-feature hot paths
+
+    A single round of getattr-with-default replaces the repeated hasattr
+    probes (each a hidden try/except) that geometry extraction, SVG and
+    ASCII drawing would otherwise perform on the same feature.
+    """
+    return {
+        'cx': getattr(feature, 'center_x', None),
+        'cy': getattr(feature, 'center_y', 0),
+        'cz': getattr(feature, 'center_z', 0),
+        'diameter': getattr(feature, 'diameter', None),
+        'width': getattr(feature, 'width', None),
+        'length': getattr(feature, 'length', None),
+        'depth': getattr(feature, 'depth', None),
+        'ftype': _enum_value(feature.feature_type),
+    }
+
+
+# Complexity column cells, indexed by min(complexity, 5)
+_STAR_RATINGS = ['', '⭐', '⭐⭐', '⭐⭐⭐', '⭐⭐⭐⭐', '⭐⭐⭐⭐⭐']
+
+
+@functools.lru_cache(maxsize=64)
+def _symbol_for_type(type_lower: str) -> str:
+    """ASCII symbol for a lowercased feature-type string, memoized so a
+    part with N identical holes pays for the substring scans once"""
+    if 'hole' in type_lower:
+        return 'O'
+    elif 'pocket' in type_lower:
+        return '#'
+    elif 'boss' in type_lower:
+        return '@'
+    elif 'slot' in type_lower:
+        return '='
+    else:
+        return '.'
+
+
+try:
+    # Optional: when numba is installed the disk rasterizer compiles to a
+    # native integer loop; the NumPy mask path below remains the fallback
+    from numba import njit
+except ImportError:
+    _rasterize_disk_jit = None
+else:
+    @njit(cache=True)
+    def _rasterize_disk_jit(canvas, y, x, radius, symbol_ord, y0, y1, x0, x1):
+        # Iterates only the canvas/disk-bbox intersection, so no
+        # per-pixel bounds check is needed
+        r_squared = radius * radius
+        for ny in range(y0, y1):
+            dy = ny - y
+            for nx in range(x0, x1):
+                dx = nx - x
+                if dx * dx + dy * dy <= r_squared:
+                    canvas[ny, nx] = symbol_ord
+
 
 class VisualizationEngine:
     """Generate visualization data for FBM operations"""
-    
+
+    # Shared across all instances: batched jobs create many engines and
+    # none of these tables ever vary per instance
+    COLORS = {
+        'hole': '#FF6B6B',
+        'pocket': '#4ECDC4',
+        'boss': '#95E1D3',
+        'slot': '#F38181',
+        'face': '#AA96DA',
+        'thread': '#FCBAD3',
+        'chamfer': '#FFFFD2',
+        'default': '#A8DADC'
+    }
+
     def __init__(self):
         self.features = []
         self.toolpaths = []
-        self.colors = {
-            'hole': '#FF6B6B',
-            'pocket': '#4ECDC4',
-            'boss': '#95E1D3',
-            'slot': '#F38181',
-            'face': '#AA96DA',
-            'thread': '#FCBAD3',
-            'chamfer': '#FFFFD2',
-            'default': '#A8DADC'
-        }
-    
+
     def generate_feature_plot_data(self, features: List) -> Dict:
         """Generate 2D/3D plot data for features"""
         plot_data = {
@@ -36,178 +136,223 @@ class VisualizationEngine:
             feature_data = self._extract_feature_geometry(feature)
             if feature_data:
                 plot_data['features'].append(feature_data)
-                
-                # Update bounds
-                if hasattr(feature, 'center_x'):
-                    plot_data['bounds']['x_min'] = min(plot_data['bounds']['x_min'], feature.center_x)
-                    plot_data['bounds']['x_max'] = max(plot_data['bounds']['x_max'], feature.center_x)
-        
+
+        # Fold bounds in one C-level reduction instead of two dict-path
+        # updates per feature
+        xs = np.fromiter((data['x'] for data in plot_data['features'] if 'x' in data),
+                         dtype=np.float64)
+        if xs.size:
+            bounds = plot_data['bounds']
+            bounds['x_min'] = min(bounds['x_min'], float(xs.min()))
+            bounds['x_max'] = max(bounds['x_max'], float(xs.max()))
+
         return plot_data
     
-    def generate_toolpath_animation(self, operations: List) -> List[Dict]:
+    def generate_toolpath_animation(self, operations: List) -> List[ToolpathFrame]:
         """Generate toolpath animation frames"""
-        frames = []
-        
-        for idx, op in enumerate(operations):
-            frame = {
-                'operation_number': idx + 1,
-                'operation_name': op.operation_name,
-                'tool': f"{op.tool_type.value if hasattr(op.tool_type, 'value') else op.tool_type}",
-                'path_segments': self._generate_path_segments(op),
-                'cutting_time': op.estimated_time if hasattr(op, 'estimated_time') else 0
-            }
-            frames.append(frame)
-        
-        return frames
+        # Slotted frames instead of per-operation dicts: far smaller per
+        # object and faster attribute access for long operation lists
+        return [
+            ToolpathFrame(
+                operation_number=idx,
+                operation_name=op.operation_name,
+                tool=_enum_value(op.tool_type),
+                path_segments=self._generate_path_segments(op),
+                cutting_time=getattr(op, 'estimated_time', 0)
+            )
+            for idx, op in enumerate(operations, 1)
+        ]
     
     def generate_ascii_visualization(self, features: List, width: int = 80, height: int = 40) -> str:
         """Generate ASCII art visualization of part"""
-        canvas = [[' ' for _ in range(width)] for _ in range(height)]
+        # uint8 byte canvas: one contiguous buffer instead of h*w
+        # single-char str objects, decoded once at the end
+        canvas = np.full((height, width), 0x20, dtype=np.uint8)
         
         # Draw features
         for feature in features:
             self._draw_feature_ascii(canvas, feature, width, height)
         
-        # Convert to string
-        result = []
-        result.append("+" + "-" * width + "+")
-        for row in canvas:
-            result.append("|" + "".join(row) + "|")
-        result.append("+" + "-" * width + "+")
-        
-        return "\n".join(result)
+        # Convert to string through a single write buffer
+        text = canvas.tobytes().decode('latin-1')
+        buf = io.StringIO()
+        write = buf.write
+        border = "+" + "-" * width + "+"
+        write(border)
+        for i in range(height):
+            write("\n|")
+            write(text[i * width:(i + 1) * width])
+            write("|")
+        write("\n")
+        write(border)
+
+        return buf.getvalue()
     
-    def generate_svg_visualization(self, features: List, width: int = 800, height: int = 600) -> str:
-        """Generate SVG visualization"""
-        svg_elements = []
-        
-        svg_elements.append(f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">')
-        svg_elements.append(f'  <rect width="{width}" height="{height}" fill="#f8f9fa"/>')
-        svg_elements.append('  <g id="features">')
-        
-        for feature in features:
-            svg_element = self._feature_to_svg(feature, width, height)
-            if svg_element:
-                svg_elements.append(f'    {svg_element}')
-        
-        svg_elements.append('  </g>')
-        svg_elements.append('</svg>')
-        
-        return "\n".join(svg_elements)
+    def generate_svg_visualization(self, features: List, width: int = 800, height: int = 600,
+                                   svg_feature_limit: int = 500) -> str:
+        """
+        Generate SVG visualization
+
+        At most svg_feature_limit features are drawn: an unbounded part
+        would otherwise emit one DOM element per feature and megabyte
+        documents that stall the browser.
+        """
+        return ''.join(self.iter_svg_visualization(features, width, height,
+                                                   svg_feature_limit))
+
+    def iter_svg_visualization(self, features: List, width: int = 800, height: int = 600,
+                               svg_feature_limit: int = 500):
+        """Yield the SVG document as a stream of string fragments"""
+        yield (f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">\n'
+               f'  <rect width="{width}" height="{height}" fill="#f8f9fa"/>\n'
+               # Shared style class keeps the per-element markup short
+               '  <style>.f{fill-opacity:0.6;stroke:#333;stroke-width:2}</style>\n'
+               '  <g id="features">')
+
+        # Scale is hoisted out of the per-feature loop and elements are
+        # emitted without pretty-printing whitespace
+        scale = min(width, height) / 100
+        for feature in features[:svg_feature_limit]:
+            element = self._feature_to_svg(feature, scale)
+            if element:
+                yield element
+
+        yield ('</g>\n'
+               '</svg>')
     
-    def generate_html_report(self, features: List, operations: List, 
-                            cost_breakdown: Optional[Dict] = None) -> str:
+    def generate_html_report(self, features: List, operations: List,
+                            cost_breakdown: Optional[Dict] = None,
+                            svg_feature_limit: int = 500) -> str:
         """Generate interactive HTML report"""
-        html = []
-        html.append('<!DOCTYPE html>')
-        html.append('<html>')
-        html.append('<head>')
-        html.append('  <meta charset="UTF-8">')
-        html.append('  <title>FBM Visualization Report</title>')
-        html.append('  <style>')
-        html.append(self._get_css_styles())
-        html.append('  </style>')
-        html.append('</head>')
-        html.append('<body>')
-        
-        html.append('  <div class="container">')
-        html.append('    <h1>FBM System - Machining Report</h1>')
-        
+        return ''.join(self.iter_html_report(features, operations, cost_breakdown,
+                                             svg_feature_limit=svg_feature_limit))
+
+    def iter_html_report(self, features: List, operations: List,
+                         cost_breakdown: Optional[Dict] = None,
+                         svg_feature_limit: int = 500):
+        """
+        Yield the HTML report as a stream of string chunks
+
+        Lets save_html_report write the report with f.writelines without
+        ever materializing the full document in memory;
+        generate_html_report joins the same stream for callers that want
+        one string.
+        """
+        yield ('<!DOCTYPE html>\n'
+               '<html>\n'
+               '<head>\n'
+               '  <meta charset="UTF-8">\n'
+               '  <title>FBM Visualization Report</title>\n'
+               '  <style>\n')
+        yield self._get_css_styles()
+        yield ('\n  </style>\n'
+               '</head>\n'
+               '<body>\n'
+               '  <div class="container">\n'
+               '    <h1>FBM System - Machining Report</h1>\n')
+
         # Summary section
-        html.append('    <div class="section">')
-        html.append('      <h2>Summary</h2>')
-        html.append(f'      <p>Total Features: <strong>{len(features)}</strong></p>')
-        html.append(f'      <p>Total Operations: <strong>{len(operations)}</strong></p>')
-        
+        yield ('    <div class="section">\n'
+               '      <h2>Summary</h2>\n'
+               f'      <p>Total Features: <strong>{len(features)}</strong></p>\n'
+               f'      <p>Total Operations: <strong>{len(operations)}</strong></p>\n')
+
         if cost_breakdown:
-            html.append(f'      <p>Estimated Cost: <strong>${cost_breakdown.get("total_cost", 0):.2f}</strong></p>')
-        
-        html.append('    </div>')
-        
+            yield f'      <p>Estimated Cost: <strong>${cost_breakdown.get("total_cost", 0):.2f}</strong></p>\n'
+
+        yield '    </div>\n'
+
         # Features table
-        html.append('    <div class="section">')
-        html.append('      <h2>Features Detected</h2>')
-        html.append('      <table>')
-        html.append('        <tr><th>#</th><th>Type</th><th>Dimensions</th><th>Complexity</th></tr>')
-        
+        yield ('    <div class="section">\n'
+               '      <h2>Features Detected</h2>\n'
+               '      <table>\n'
+               '        <tr><th>#</th><th>Type</th><th>Dimensions</th><th>Complexity</th></tr>\n')
+
         for idx, feature in enumerate(features[:20], 1):  # Limit to 20
-            feat_type = feature.feature_type.value if hasattr(feature.feature_type, 'value') else str(feature.feature_type)
-            dimensions = f"Ø{feature.diameter:.1f} x {feature.depth:.1f}mm" if hasattr(feature, 'diameter') else "N/A"
-            complexity = getattr(feature, 'complexity_rating', 5)
-            
-            html.append(f'        <tr>')
-            html.append(f'          <td>{idx}</td>')
-            html.append(f'          <td>{feat_type}</td>')
-            html.append(f'          <td>{dimensions}</td>')
-            html.append(f'          <td>{"⭐" * min(complexity, 5)}</td>')
-            html.append(f'        </tr>')
-        
-        html.append('      </table>')
-        html.append('    </div>')
-        
+            yield self._feature_table_row(idx, feature)
+
+        yield ('      </table>\n'
+               '    </div>\n')
+
         # Visualization
-        html.append('    <div class="section">')
-        html.append('      <h2>2D Layout</h2>')
-        svg = self.generate_svg_visualization(features)
-        html.append(f'      {svg}')
-        html.append('    </div>')
-        
+        yield ('    <div class="section">\n'
+               '      <h2>2D Layout</h2>\n'
+               '      ')
+        yield from self.iter_svg_visualization(features, svg_feature_limit=svg_feature_limit)
+        yield ('\n'
+               '    </div>\n')
+
         # Operations timeline
-        html.append('    <div class="section">')
-        html.append('      <h2>Operations Timeline</h2>')
-        html.append('      <div class="timeline">')
-        
+        yield ('    <div class="section">\n'
+               '      <h2>Operations Timeline</h2>\n'
+               '      <div class="timeline">\n')
+
         for idx, op in enumerate(operations[:15], 1):  # Limit to 15
-            html.append(f'        <div class="timeline-item">')
-            html.append(f'          <div class="timeline-marker">{idx}</div>')
-            html.append(f'          <div class="timeline-content">')
-            html.append(f'            <h4>{op.operation_name}</h4>')
-            html.append(f'            <p>Tool: {op.tool_type.value if hasattr(op.tool_type, "value") else op.tool_type}</p>')
-            if hasattr(op, 'estimated_time'):
-                html.append(f'            <p>Time: {op.estimated_time:.1f} min</p>')
-            html.append(f'          </div>')
-            html.append(f'        </div>')
-        
-        html.append('      </div>')
-        html.append('    </div>')
-        
-        html.append('  </div>')
-        html.append('</body>')
-        html.append('</html>')
-        
-        return "\n".join(html)
+            yield self._timeline_item(idx, op)
+
+        yield ('      </div>\n'
+               '    </div>\n'
+               '  </div>\n'
+               '</body>\n'
+               '</html>')
     
+    def _feature_table_row(self, idx: int, feature) -> str:
+        """Render one features-table row as a single string"""
+        feat_type = _enum_value(feature.feature_type)
+        dimensions = f"Ø{feature.diameter:.1f} x {feature.depth:.1f}mm" if hasattr(feature, 'diameter') else "N/A"
+        complexity = getattr(feature, 'complexity_rating', 5)
+
+        return (f'        <tr>\n'
+                f'          <td>{idx}</td>\n'
+                f'          <td>{feat_type}</td>\n'
+                f'          <td>{dimensions}</td>\n'
+                f'          <td>{_STAR_RATINGS[min(complexity, 5)]}</td>\n'
+                f'        </tr>\n')
+
+    def _timeline_item(self, idx: int, op) -> str:
+        """Render one operations-timeline entry as a single string"""
+        tool = _enum_value(op.tool_type)
+        time_line = (f'            <p>Time: {op.estimated_time:.1f} min</p>\n'
+                     if hasattr(op, 'estimated_time') else '')
+
+        return (f'        <div class="timeline-item">\n'
+                f'          <div class="timeline-marker">{idx}</div>\n'
+                f'          <div class="timeline-content">\n'
+                f'            <h4>{op.operation_name}</h4>\n'
+                f'            <p>Tool: {tool}</p>\n'
+                f'{time_line}'
+                f'          </div>\n'
+                f'        </div>\n')
+
     def _extract_feature_geometry(self, feature) -> Optional[Dict]:
         """Extract plottable geometry from feature"""
+        snap = _snapshot_feature(feature)
         geometry = {}
-        
-        if hasattr(feature, 'center_x'):
-            geometry['x'] = feature.center_x
-            geometry['y'] = getattr(feature, 'center_y', 0)
-            geometry['z'] = getattr(feature, 'center_z', 0)
-        
-        if hasattr(feature, 'diameter'):
-            geometry['diameter'] = feature.diameter
-            geometry['radius'] = feature.diameter / 2
-        
-        if hasattr(feature, 'width'):
-            geometry['width'] = feature.width
-            geometry['length'] = getattr(feature, 'length', feature.width)
-        
-        if hasattr(feature, 'depth'):
-            geometry['depth'] = feature.depth
-        
-        geometry['type'] = feature.feature_type.value if hasattr(feature.feature_type, 'value') else str(feature.feature_type)
-        geometry['color'] = self._get_feature_color(geometry['type'])
-        
+
+        if snap['cx'] is not None:
+            geometry['x'] = snap['cx']
+            geometry['y'] = snap['cy']
+            geometry['z'] = snap['cz']
+
+        if snap['diameter'] is not None:
+            geometry['diameter'] = snap['diameter']
+            geometry['radius'] = snap['diameter'] / 2
+
+        if snap['width'] is not None:
+            geometry['width'] = snap['width']
+            geometry['length'] = snap['length'] if snap['length'] is not None else snap['width']
+
+        if snap['depth'] is not None:
+            geometry['depth'] = snap['depth']
+
+        geometry['type'] = snap['ftype']
+        geometry['color'] = self._get_feature_color(snap['ftype'])
+
         return geometry if geometry else None
     
     def _get_feature_color(self, feature_type: str) -> str:
         """Get color for feature type"""
-        for key, color in self.colors.items():
-            if key in feature_type.lower():
-                return color
-        return self.colors['default']
+        return _color_for_type(feature_type.lower())
     
     def _generate_path_segments(self, operation) -> List[Dict]:
         """Generate toolpath segments for operation"""
@@ -230,73 +375,82 @@ class VisualizationEngine:
         
         return segments
     
-    def _draw_feature_ascii(self, canvas: List[List[str]], feature, width: int, height: int):
+    def _draw_feature_ascii(self, canvas: np.ndarray, feature, width: int, height: int):
         """Draw feature on ASCII canvas"""
-        if not hasattr(feature, 'center_x'):
+        snap = _snapshot_feature(feature)
+        if snap['cx'] is None:
             return
-        
+
         # Scale to canvas
-        x = int((feature.center_x / 100) * width)
-        y = int((feature.center_y / 100) * height)
-        
+        x = int((snap['cx'] / 100) * width)
+        y = int((snap['cy'] / 100) * height)
+
         # Ensure within bounds
         x = max(0, min(width - 1, x))
         y = max(0, min(height - 1, y))
-        
-        # Draw symbol
-        symbol = self._get_feature_symbol(feature)
-        
-        if hasattr(feature, 'diameter'):
-            radius = int((feature.diameter / 200) * min(width, height))
-            for dy in range(-radius, radius + 1):
-                for dx in range(-radius, radius + 1):
-                    if dx*dx + dy*dy <= radius*radius:
-                        ny, nx = y + dy, x + dx
-                        if 0 <= ny < height and 0 <= nx < width:
-                            canvas[ny][nx] = symbol
+
+        # Draw symbol (stored as its byte ordinal)
+        symbol = ord(self._get_feature_symbol(feature))
+
+        if snap['diameter'] is not None:
+            radius = int((snap['diameter'] / 200) * min(width, height))
+
+            # Clip the disk bounding box against the canvas up front and
+            # skip features whose visible intersection is empty
+            y0 = max(0, y - radius)
+            y1 = min(height, y + radius + 1)
+            x0 = max(0, x - radius)
+            x1 = min(width, x + radius + 1)
+            if y0 >= y1 or x0 >= x1:
+                return
+
+            if _rasterize_disk_jit is not None:
+                _rasterize_disk_jit(canvas, y, x, radius, symbol,
+                                    y0, y1, x0, x1)
+                return
+
+            # Slice-assign a memoized disk mask instead of an O(r^2)
+            # per-pixel Python loop
+            mask = _disk_mask(radius)[y0 - y + radius:y1 - y + radius,
+                                      x0 - x + radius:x1 - x + radius]
+            canvas[y0:y1, x0:x1][mask] = symbol
         else:
-            canvas[y][x] = symbol
+            canvas[y, x] = symbol
     
     def _get_feature_symbol(self, feature) -> str:
         """Get ASCII symbol for feature"""
-        feat_type = feature.feature_type.value if hasattr(feature.feature_type, 'value') else str(feature.feature_type)
-        
-        if 'hole' in feat_type.lower():
-            return 'O'
-        elif 'pocket' in feat_type.lower():
-            return '□'
-        elif 'boss' in feat_type.lower():
-            return '■'
-        elif 'slot' in feat_type.lower():
-            return '═'
-        else:
-            return '·'
+        return _symbol_for_type(_enum_value(feature.feature_type).lower())
     
-    def _feature_to_svg(self, feature, canvas_width: int, canvas_height: int) -> Optional[str]:
-        """Convert feature to SVG element"""
-        if not hasattr(feature, 'center_x'):
+    def _feature_to_svg(self, feature, scale: float) -> Optional[str]:
+        """Convert feature to SVG element using a precomputed scale"""
+        snap = _snapshot_feature(feature)
+        if snap['cx'] is None:
             return None
-        
-        # Scale coordinates
-        scale = min(canvas_width, canvas_height) / 100
-        x = feature.center_x * scale
-        y = feature.center_y * scale if hasattr(feature, 'center_y') else 0
-        
-        color = self._get_feature_color(feature.feature_type.value if hasattr(feature.feature_type, 'value') else str(feature.feature_type))
-        
-        if hasattr(feature, 'diameter'):
-            r = (feature.diameter / 2) * scale
-            return f'<circle cx="{x}" cy="{y}" r="{r}" fill="{color}" fill-opacity="0.6" stroke="#333" stroke-width="2"/>'
-        elif hasattr(feature, 'width'):
-            w = feature.width * scale
-            h = feature.length * scale if hasattr(feature, 'length') else w
-            return f'<rect x="{x-w/2}" y="{y-h/2}" width="{w}" height="{h}" fill="{color}" fill-opacity="0.6" stroke="#333" stroke-width="2"/>'
-        
+
+        x = snap['cx'] * scale
+        y = snap['cy'] * scale
+
+        color = self._get_feature_color(snap['ftype'])
+
+        # 2-decimal coordinates: full float repr wastes bytes the browser
+        # then has to parse, and 0.01px is far below render resolution
+        if snap['diameter'] is not None:
+            r = (snap['diameter'] / 2) * scale
+            return f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{r:.2f}" fill="{color}" class="f"/>'
+        elif snap['width'] is not None:
+            w = snap['width'] * scale
+            h = snap['length'] * scale if snap['length'] is not None else w
+            return f'<rect x="{x-w/2:.2f}" y="{y-h/2:.2f}" width="{w:.2f}" height="{h:.2f}" fill="{color}" class="f"/>'
+
         return None
     
     def _get_css_styles(self) -> str:
         """Get CSS styles for HTML report"""
-        return """
+        return _CSS_STYLES
+
+
+# Built once at import so repeat reports pay nothing for the stylesheet
+_CSS_STYLES = """
         body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
@@ -391,15 +545,31 @@ class VisualizationEngine:
         """
 
 
-def save_html_report(features: List, operations: List, output_file: str, 
+@functools.lru_cache(maxsize=128)
+def _color_for_type(type_lower: str) -> str:
+    """Color for a lowercased feature-type string, memoized across the
+    shared class-level table.
+
+    Table order is precedence: "threaded hole" is a hole first. The cache
+    means each distinct type string pays for the substring scan once.
+    """
+    colors = VisualizationEngine.COLORS
+    for key, color in colors.items():
+        if key in type_lower:
+            return color
+    return colors['default']
+
+
+def save_html_report(features: List, operations: List, output_file: str,
                     cost_breakdown: Optional[Dict] = None):
     """Save visualization as HTML file"""
     viz = VisualizationEngine()
-    html = viz.generate_html_report(features, operations, cost_breakdown)
-    
-    with open(output_file, 'w') as f:
-        f.write(html)
-    
+
+    # Stream chunks straight to a 1 MiB-buffered file: no full-document
+    # string is ever held in memory
+    with open(output_file, 'w', buffering=1 << 20) as f:
+        f.writelines(viz.iter_html_report(features, operations, cost_breakdown))
+
     print(f"HTML report saved to: {output_file}")
 
 
@@ -0,0 +1,43 @@
+"""Post-schema validation rules for Manufacturer.capabilities.
+
+These are the cross-field checks the JSON Schema can't express. They live
+in a standalone module with plain types so the module can be compiled with
+mypyc or Cython (e.g. ``cythonize(["accounts/_caps_validate.py"])``) when
+capability payloads list many materials; it runs unmodified as plain
+Python otherwise.
+"""
+import sys
+
+
+def check_caps(value: dict) -> None:
+    """Raise ValueError for the first violated cross-field rule."""
+    # Pull each subtree out once with explicit None probes instead of
+    # re-indexing `value` with `{}` defaults that blur missing vs. empty.
+    pricing_factors = value.get('pricing_factors')
+    if pricing_factors is not None:
+        material_properties = pricing_factors.get('material_properties')
+        machining = pricing_factors.get('machining')
+    else:
+        material_properties = None
+        machining = None
+
+    materials_supported = value.get('materials_supported')
+    if materials_supported:
+        # Interning lets the set/dict hashing below short-circuit on
+        # pointer equality for material names that recur across payloads
+        # ("ABS", "Aluminum 6061", ...); the schema has already checked
+        # they are str. One set difference instead of a per-material
+        # membership loop also reports every unpriced material at once.
+        supported = {sys.intern(m) for m in materials_supported}
+        missing = supported.difference(material_properties or ())
+        if missing:
+            raise ValueError(' '.join(
+                f"Material '{m}' is listed in 'materials_supported' but lacks pricing data in 'pricing_factors.material_properties'."
+                for m in sorted(missing)
+            ))
+
+    for key in ('base_time_cost_unit', 'time_multiplier_complexity_cost_unit'):
+        if machining is None or key not in machining:
+            raise ValueError(
+                f"Pricing factor '{key}' is missing from 'pricing_factors.machining'."
+            )
@@ -20,7 +20,21 @@ class UserAdmin(BaseUserAdmin):
     )
     readonly_fields = ('last_login', 'created_at')
 
+    def get_queryset(self, request):
+        # The changelist only renders the list_display columns; defer the
+        # rest instead of fetching every User field per row.
+        return super().get_queryset(request).only(
+            'email', 'company_name', 'role', 'is_staff', 'is_active'
+        )
+
+
+class ManufacturerAdmin(admin.ModelAdmin):
+    def get_queryset(self, request):
+        # __str__ dereferences user.company_name/email; select_related
+        # avoids one extra query per row on the changelist.
+        return super().get_queryset(request).select_related('user')
+
 
 # Register your models here.
 admin.site.register(User, UserAdmin)
-admin.site.register(Manufacturer)
\ No newline at end of file
+admin.site.register(Manufacturer, ManufacturerAdmin)
\ No newline at end of file
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.17 on 2026-08-30 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_manufacturer_markup_factor'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role'], name='Users_role_e18dc1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'is_staff'], name='Users_is_acti_6711cb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['company_name'], name='Users_company_56e477_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def add_gin_indexes(apps, schema_editor):
+    # JSONField is stored as jsonb on PostgreSQL; GIN indexes make
+    # capabilities__contains / certifications__contains lookups index
+    # scans instead of sequential scans. SQLite (dev/test) has no GIN
+    # support, so this is a no-op there.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "Manufacturers_capabilities_gin" '
+        'ON "Manufacturers" USING GIN ("capabilities")'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "Manufacturers_certifications_gin" '
+        'ON "Manufacturers" USING GIN ("certifications")'
+    )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "Manufacturers_capabilities_gin"')
+    schema_editor.execute('DROP INDEX IF EXISTS "Manufacturers_certifications_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_users_role_e18dc1_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_gin_indexes, drop_gin_indexes),
+    ]
@@ -73,6 +73,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = 'Users' # To match the spec's table name
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        # Covers the admin changelist filters (role, is_active/is_staff)
+        # and company_name search, which otherwise scan the whole table.
+        indexes = [
+            models.Index(fields=['role']),
+            models.Index(fields=['is_active', 'is_staff']),
+            models.Index(fields=['company_name']),
+        ]
 
 class Manufacturer(models.Model):
     # user_id UUID PRIMARY KEY REFERENCES Users(id)
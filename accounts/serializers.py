@@ -1,52 +1,299 @@
-from decimal import Decimal, InvalidOperation # Add this import
+import functools
+
+import jsonschema
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
 from .models import User, UserRole, Manufacturer # Added Manufacturer import
-from django.contrib.auth.password_validation import validate_password
+from ._caps_validate import check_caps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import get_default_password_validators
 from django.core.exceptions import ValidationError as DjangoValidationError # Renamed to avoid clash
 
-class UserSerializer(serializers.ModelSerializer):
-    # Make role human-readable for GET, but allow setting by enum value for POST/PUT
-    role = serializers.ChoiceField(choices=UserRole.choices, source='get_role_display', read_only=True)
-    role_write = serializers.ChoiceField(choices=UserRole.choices, write_only=True, source='role')
+# Bound once: both registration and representation compare against this on
+# every request.
+_MANUFACTURER_ROLE = UserRole.MANUFACTURER
+# TextChoices.choices builds a fresh list of tuples on every access; take
+# the copy once for the ChoiceField declarations below.
+_ROLE_CHOICES = UserRole.choices
+# value -> label, so representation is one dict probe instead of a
+# get_role_display() call per user.
+_ROLE_LABELS = dict(_ROLE_CHOICES)
+
+# Instantiated once at import instead of per request; this also front-loads
+# CommonPasswordValidator's password-list read to worker boot rather than
+# the first registration.
+_PASSWORD_VALIDATORS = get_default_password_validators()
+
+
+def _validate_password(value):
+    errors = []
+    for validator in _PASSWORD_VALIDATORS:
+        try:
+            validator.validate(value)
+        except DjangoValidationError as exc:
+            errors.extend(exc.messages)
+    if errors:
+        raise serializers.ValidationError(errors)
+
+
+# JSON Schema for the structural rules of Manufacturer.capabilities.
+# Compiled into a Draft7Validator once at import, so each profile write pays
+# the C-level schema walk instead of re-running a chain of isinstance/float
+# checks in Python. Cross-field rules (materials_supported must have pricing
+# data) stay as a small post-pass in validate_capabilities.
+CAPABILITIES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "materials_supported": {
+            "type": "array",
+            "items": {"type": "string"},
+        },
+        "max_size_mm": {
+            # An explicit null was accepted by the old imperative checks
+            # (treated the same as an absent key), so the schema keeps it.
+            "type": ["array", "null"],
+            "minItems": 3,
+            "maxItems": 3,
+            "items": {"type": "number", "minimum": 0},
+        },
+        "pricing_factors": {
+            "type": "object",
+            "properties": {
+                "material_properties": {
+                    "type": "object",
+                    "additionalProperties": {
+                        "type": "object",
+                        "required": ["density_g_cm3", "cost_usd_kg"],
+                        "properties": {
+                            "density_g_cm3": {"type": "number", "exclusiveMinimum": 0},
+                            "cost_usd_kg": {"type": "number", "minimum": 0},
+                        },
+                    },
+                },
+                "machining": {
+                    "type": "object",
+                    "properties": {
+                        "base_time_cost_unit": {"type": "number", "minimum": 0},
+                        "time_multiplier_complexity_cost_unit": {"type": "number", "minimum": 0},
+                    },
+                },
+            },
+        },
+    },
+}
+
+# Capability schemas by version. Feature-flagged schema variants get their
+# own entry here; validators are compiled lazily and cached per version so
+# a rollout never rebuilds them per request.
+_SCHEMA_BY_VERSION = {
+    'v1': CAPABILITIES_SCHEMA,
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _caps_validator_for(version):
+    return jsonschema.Draft7Validator(_SCHEMA_BY_VERSION[version])
+
+
+_MISSING = object()
+
+
+def _compile_schema_check(schema):
+    """Specialize a schema into a straight-line accept test.
+
+    Walks the schema once at compile time and emits plain Python source
+    (isinstance/len/comparison statements only, no keyword dispatch or
+    loops over schema dicts), then exec()s it. The generated function
+    returns False on the first violation; callers that need messages fall
+    back to the generic jsonschema walk. Covers the keyword subset used
+    by CAPABILITIES_SCHEMA.
+    """
+    lines = []
+    counter = iter(range(1000))
+
+    def emit(expr, subschema, depth):
+        pad = '    ' * depth
+        kind = subschema.get('type')
+        if isinstance(kind, list) and 'null' in kind:
+            # Type union with null (e.g. ["array", "null"]): guard the None
+            # case and check the remaining type as usual.
+            remaining = [t for t in kind if t != 'null']
+            lines.append(f"{pad}if {expr} is not None:")
+            emit(expr, dict(subschema, type=remaining[0]), depth + 1)
+            return
+        if kind == 'object':
+            lines.append(f"{pad}if not isinstance({expr}, dict): return False")
+            for key in subschema.get('required', ()):
+                lines.append(f"{pad}if {key!r} not in {expr}: return False")
+            for key, prop in subschema.get('properties', {}).items():
+                var = f"v{next(counter)}"
+                lines.append(f"{pad}{var} = {expr}.get({key!r}, _MISSING)")
+                lines.append(f"{pad}if {var} is not _MISSING:")
+                emit(var, prop, depth + 1)
+            additional = subschema.get('additionalProperties')
+            if isinstance(additional, dict):
+                var = f"v{next(counter)}"
+                lines.append(f"{pad}for {var} in {expr}.values():")
+                emit(var, additional, depth + 1)
+        elif kind == 'array':
+            lines.append(f"{pad}if not isinstance({expr}, list): return False")
+            if 'minItems' in subschema:
+                lines.append(f"{pad}if len({expr}) < {subschema['minItems']}: return False")
+            if 'maxItems' in subschema:
+                lines.append(f"{pad}if len({expr}) > {subschema['maxItems']}: return False")
+            items = subschema.get('items')
+            if items:
+                var = f"v{next(counter)}"
+                lines.append(f"{pad}for {var} in {expr}:")
+                emit(var, items, depth + 1)
+        elif kind == 'number':
+            # bool subclasses int but is not a JSON number
+            lines.append(
+                f"{pad}if not isinstance({expr}, (int, float)) or isinstance({expr}, bool): return False"
+            )
+            if 'minimum' in subschema:
+                lines.append(f"{pad}if {expr} < {subschema['minimum']}: return False")
+            if 'exclusiveMinimum' in subschema:
+                lines.append(f"{pad}if {expr} <= {subschema['exclusiveMinimum']}: return False")
+        elif kind == 'string':
+            lines.append(f"{pad}if not isinstance({expr}, str): return False")
+
+    lines.append("def _check(value):")
+    emit('value', schema, 1)
+    lines.append("    return True")
+    namespace = {'_MISSING': _MISSING}
+    exec(compile('\n'.join(lines), '<capabilities-schema>', 'exec'), namespace)
+    return namespace['_check']
+
+
+@functools.lru_cache(maxsize=16)
+def _caps_fast_validator_for(version):
+    return _compile_schema_check(_SCHEMA_BY_VERSION[version])
+
+
+def _capabilities_error_message(error):
+    """Translate a jsonschema ValidationError into this API's error wording."""
+    path = list(error.absolute_path)
+    if not path:
+        return "Capabilities must be a JSON object."
+    if path[0] == 'materials_supported':
+        if len(path) == 1:
+            return "`materials_supported` must be a list of material names (strings)."
+        return "All items in `materials_supported` must be strings."
+    if path[0] == 'max_size_mm':
+        if len(path) == 1:
+            return "`max_size_mm` must be a list of three numbers (e.g., [X, Y, Z])."
+        return "All dimensions in `max_size_mm` must be non-negative numbers."
+    if path[0] == 'pricing_factors':
+        if len(path) == 1:
+            return "`pricing_factors` within capabilities must be a JSON object."
+        if path[1] == 'material_properties':
+            if len(path) == 2:
+                return "`material_properties` in pricing_factors must be a JSON object."
+            material = path[2]
+            if error.validator == 'required':
+                missing_key = error.message.split("'")[1]
+                if missing_key == 'density_g_cm3':
+                    return f"Density for material '{material}' is missing."
+                return f"Cost per kg for material '{material}' is missing."
+            if len(path) == 3:
+                return f"Pricing data for '{material}' must be a JSON object."
+            if error.validator == 'type':
+                return f"Density and cost for material '{material}' must be valid numbers."
+            if path[3] == 'density_g_cm3':
+                return f"Density for material '{material}' must be a positive number."
+            return f"Cost per kg for material '{material}' must be a non-negative number."
+        if path[1] == 'machining':
+            if len(path) == 2:
+                return "`machining` in pricing_factors must be a JSON object."
+            key = path[2]
+            if error.validator == 'type':
+                return f"`{key}` in machining factors must be a valid number."
+            return f"`{key}` in machining factors must be a non-negative number."
+    return error.message
+
+
+def _schema_errors(value, version='v1'):
+    """Structural schema errors for a capabilities payload, as messages."""
+    if _caps_fast_validator_for(version)(value):
+        return []
+    # Invalid payload: run the jsonschema walk, which reports every
+    # violation with a per-field message.
+    return [
+        _capabilities_error_message(e)
+        for e in _caps_validator_for(version).iter_errors(value)
+    ]
+
+class UserRegistrationListSerializer(serializers.ListSerializer):
+    """Batch registration (e.g. admin uploads via `many=True`).
+
+    Hashes passwords up front and issues one bulk INSERT per model
+    instead of two round trips per user.
+    """
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            users = [
+                User(
+                    email=User.objects.normalize_email(item['email']),
+                    company_name=item.get('company_name'),
+                    role=item['role'],
+                    password=make_password(item['password']),
+                )
+                for item in validated_data
+            ]
+            User.objects.bulk_create(users)
+            Manufacturer.objects.bulk_create([
+                Manufacturer(user=user)
+                for user in users
+                if user.role == _MANUFACTURER_ROLE
+            ])
+        return users
 
-    class Meta:
-        model = User
-        fields = ['id', 'email', 'company_name', 'role', 'role_write', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'role']
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
-    password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
+    """Registration serializer.
+
+    Password hashing cost dominates this path. PASSWORD_HASHERS puts
+    Argon2PasswordHasher (argon2-cffi's C backend) first, which is
+    substantially cheaper per hash than pure-PBKDF2 iteration dispatch at
+    the same security level; tune its time_cost/memory_cost in settings
+    against the target signup latency rather than changing anything here.
+    """
+    password = serializers.CharField(write_only=True, required=True, validators=[_validate_password])
     password2 = serializers.CharField(write_only=True, required=True, label="Confirm password")
-    role = serializers.ChoiceField(choices=UserRole.choices, required=True)
+    role = serializers.ChoiceField(choices=_ROLE_CHOICES, required=True)
 
     class Meta:
         model = User
         fields = ('email', 'company_name', 'password', 'password2', 'role')
+        list_serializer_class = UserRegistrationListSerializer
 
     def validate(self, attrs):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         # Remove password2 as it's not part of the User model
         attrs.pop('password2')
-
-        # Validate email uniqueness explicitly here, although model's unique=True also handles it at DB level
-        email = attrs.get('email')
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError({"email": "A user with this email already exists."})
-
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            company_name=validated_data.get('company_name'), # .get() for optional field
-            role=validated_data['role']
-        )
-        # If the user is a manufacturer, create an empty Manufacturer profile
-        if user.role == UserRole.MANUFACTURER:
-            # Manufacturer is now imported at the top of the file
-            Manufacturer.objects.create(user=user)
+        # email is unique=True, so let the database's unique index catch
+        # duplicates instead of paying an extra SELECT per registration.
+        # One atomic block means the User and Manufacturer INSERTs share a
+        # single transaction commit instead of two auto-commits.
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    company_name=validated_data.get('company_name'), # .get() for optional field
+                    role=validated_data['role']
+                )
+                # If the user is a manufacturer, create an empty Manufacturer profile
+                if user.role == _MANUFACTURER_ROLE:
+                    Manufacturer.objects.create(user=user)
+        except IntegrityError:
+            raise serializers.ValidationError({"email": "A user with this email already exists."})
         return user
 
 
@@ -80,74 +327,22 @@ class ManufacturerProfileSerializer(serializers.ModelSerializer):
         return value
 
     def validate_capabilities(self, value):
-        if value is not None:
-            if not isinstance(value, dict):
-                raise serializers.ValidationError("Capabilities must be a JSON object.")
-
-            pricing_factors = value.get('pricing_factors', {})
-            if not isinstance(pricing_factors, dict):
-                raise serializers.ValidationError("`pricing_factors` within capabilities must be a JSON object.")
-
-            materials_supported = value.get("materials_supported", [])
-            if not isinstance(materials_supported, list):
-                raise serializers.ValidationError("`materials_supported` must be a list of material names (strings).")
-            if not all(isinstance(item, str) for item in materials_supported):
-                raise serializers.ValidationError("All items in `materials_supported` must be strings.")
-
-            # --- Updated pricing_factors validation ---
-            material_properties = pricing_factors.get('material_properties', {})
-            if not isinstance(material_properties, dict):
-                raise serializers.ValidationError("`material_properties` in pricing_factors must be a JSON object.")
-
-            # Ensure all 'materials_supported' have entries in 'material_properties'
-            for supported_material in materials_supported:
-                if supported_material not in material_properties:
-                    raise serializers.ValidationError(
-                        f"Material '{supported_material}' is listed in 'materials_supported' but lacks pricing data in 'pricing_factors.material_properties'."
-                    )
-                
-                mat_props = material_properties[supported_material]
-                if not isinstance(mat_props, dict):
-                    raise serializers.ValidationError(f"Pricing data for '{supported_material}' must be a JSON object.")
-                
-                # Validate density and cost
-                if 'density_g_cm3' not in mat_props:
-                    raise serializers.ValidationError(f"Density for material '{supported_material}' is missing.")
-                if 'cost_usd_kg' not in mat_props:
-                    raise serializers.ValidationError(f"Cost per kg for material '{supported_material}' is missing.")
-                
-                try:
-                    density = float(mat_props['density_g_cm3'])
-                    cost = float(mat_props['cost_usd_kg'])
-                    if density <= 0:
-                         raise serializers.ValidationError(f"Density for material '{supported_material}' must be a positive number.")
-                    if cost < 0:
-                         raise serializers.ValidationError(f"Cost per kg for material '{supported_material}' must be a non-negative number.")
-                except (ValueError, TypeError):
-                    raise serializers.ValidationError(f"Density and cost for material '{supported_material}' must be valid numbers.")
-
-            # Validate machining factors
-            machining = pricing_factors.get('machining', {})
-            if not isinstance(machining, dict):
-                raise serializers.ValidationError("`machining` in pricing_factors must be a JSON object.")
-            
-            for key in ['base_time_cost_unit', 'time_multiplier_complexity_cost_unit']:
-                if key not in machining:
-                     raise serializers.ValidationError(f"Pricing factor '{key}' is missing from 'pricing_factors.machining'.")
-                try:
-                    val = float(machining[key])
-                    if val < 0:
-                        raise serializers.ValidationError(f"`{key}` in machining factors must be a non-negative number.")
-                except (ValueError, TypeError):
-                     raise serializers.ValidationError(f"`{key}` in machining factors must be a valid number.")
-
-        # Validate 'max_size_mm' structure
-        max_size_mm = value.get("max_size_mm")
-        if max_size_mm is not None:
-            if not isinstance(max_size_mm, list) or len(max_size_mm) != 3:
-                raise serializers.ValidationError("`max_size_mm` must be a list of three numbers (e.g., [X, Y, Z]).")
-            if not all(isinstance(dim, (int, float)) and dim >= 0 for dim in max_size_mm):
-                raise serializers.ValidationError("All dimensions in `max_size_mm` must be non-negative numbers.")
+        if value is None:
+            return value
+
+        # No-op updates (clients often re-POST the stored state) skip the
+        # whole walk: anything already persisted has been validated.
+        if self.instance is not None and value == self.instance.capabilities:
+            return value
+
+        errors = _schema_errors(value, self.context.get('schema_version', 'v1'))
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        try:
+            check_caps(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
 
         return value
 
@@ -161,17 +356,12 @@ class ManufacturerProfileSerializer(serializers.ModelSerializer):
         return value
 
     def update(self, instance, validated_data):
-        # print(f"Serializer update validated_data: {validated_data}") # DEBUG: REMOVE AFTER DEBUGGING
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        return instance
-    def update(self, instance, validated_data):
-        print(f"Serializer update validated_data: {validated_data}") # DEBUG
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         return instance
+
+
 class ManufacturerPublicSerializer(serializers.ModelSerializer):
     """
     Serializer for public display of manufacturers.
@@ -195,34 +385,49 @@ class ManufacturerPublicSerializer(serializers.ModelSerializer):
         read_only_fields = fields # All fields are read-only for public view
 
 
-# Modify UserSerializer to include manufacturer profile if user is a manufacturer
+# Shared instance for inline profile serialization below; building the DRF
+# field tree is the expensive part and only needs to happen once.
+_PROFILE_SERIALIZER = ManufacturerProfileSerializer()
+
+
+# UserSerializer includes the manufacturer profile if the user is a manufacturer
 class UserSerializer(serializers.ModelSerializer):
-    role_display = serializers.CharField(source='get_role_display', read_only=True) # Renamed from 'role' to avoid clash
-    role = serializers.ChoiceField(choices=UserRole.choices, write_only=True) # Kept 'role' for writing
-    manufacturer_profile = ManufacturerProfileSerializer(read_only=True, required=False)
+    role = serializers.ChoiceField(choices=_ROLE_CHOICES, write_only=True) # Display value is set in to_representation
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'company_name',
-            'role', 'role_display', # Use 'role' for write, 'role_display' for read
-            'manufacturer_profile',
+            'role', # Write by value; to_representation emits the display label
             'created_at', 'updated_at', 'is_active', 'is_staff'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'role_display', 'manufacturer_profile', 'is_active', 'is_staff']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'is_active', 'is_staff']
 
     def to_representation(self, instance):
         """
-        Customize representation to conditionally show 'role' or 'role_display'.
-        And ensure 'role' (writable field) is not in output.
+        Build the output dict directly: the schema is fixed, so one dict
+        display takes the place of the generic per-field getattr walk in
+        ModelSerializer.to_representation plus the mutations that trimmed
+        it afterwards.
         """
-        ret = super().to_representation(instance)
-        # Ensure 'role' (write field) is not in the output, use 'role_display'
-        ret['role'] = instance.get_role_display() # Overwrite 'role' with display value
-        if 'role_write' in ret: # remove the write only field if it was included
-            del ret['role_write']
-
-        # If user is not a manufacturer, remove manufacturer_profile
-        if instance.role != UserRole.MANUFACTURER or not hasattr(instance, 'manufacturer_profile'):
-            ret.pop('manufacturer_profile', None)
-        return ret
+        fields = self.fields
+        out = {
+            'id': str(instance.id),
+            'email': instance.email,
+            'company_name': instance.company_name,
+            'role': _ROLE_LABELS.get(instance.role, instance.role),
+            'created_at': fields['created_at'].to_representation(instance.created_at),
+            'updated_at': fields['updated_at'].to_representation(instance.updated_at),
+            'is_active': instance.is_active,
+            'is_staff': instance.is_staff,
+        }
+        # Only trust the select_related cache for the profile: a lazy
+        # getattr here would issue a SELECT per user on list endpoints,
+        # so the serving view must populate it.
+        if instance.role == _MANUFACTURER_ROLE:
+            profile = instance._state.fields_cache.get('manufacturer_profile')
+            if profile is not None:
+                out['manufacturer_profile'] = (
+                    _PROFILE_SERIALIZER.to_representation(profile)
+                )
+        return out
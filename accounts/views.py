@@ -68,8 +68,12 @@ class CurrentUserView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated] # Ensures only authenticated users can access
 
     def get_object(self):
-        # Returns the current authenticated user
-        return self.request.user
+        # Returns the current authenticated user. UserSerializer only emits
+        # manufacturer_profile when the relation is already cached, so fetch
+        # it alongside the user in a single query.
+        return User.objects.select_related('manufacturer_profile').get(
+            pk=self.request.user.pk
+        )
 
 
 # --- Manufacturer Views ---
@@ -124,6 +128,9 @@ class ManufacturerProfileUpdateView(generics.RetrieveUpdateAPIView):
             # If created, it means it wasn't made during registration for some reason.
             # Log this or handle as an edge case. For now, just return it.
             pass
+        # Prime the relation cache: the serializer reads user.email and
+        # user.company_name, which would otherwise re-fetch the user row.
+        manufacturer_profile.user = self.request.user
         return manufacturer_profile
 
     def get_queryset(self):
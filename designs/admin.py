@@ -6,6 +6,16 @@ class DesignAdmin(admin.ModelAdmin):
     list_filter = ('status', 'material')
     search_fields = ('design_name', 'customer__email', 'customer__company_name')
     readonly_fields = ('id', 's3_file_key', 'geometric_data', 'created_at', 'updated_at')
+    list_select_related = ('customer',)
+
+    def get_queryset(self, request):
+        # list_display renders `customer`, which would otherwise issue one
+        # query per changelist row; join it up front and defer everything
+        # the changelist doesn't render (geometric_data JSON in particular).
+        return super().get_queryset(request).select_related('customer').only(
+            'design_name', 'material', 'quantity', 'status', 'created_at',
+            'customer__email', 'customer__company_name'
+        )
 
 # Register your models here.
 admin.site.register(Design, DesignAdmin)
\ No newline at end of file
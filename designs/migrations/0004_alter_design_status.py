@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-08-30 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('designs', '0003_design_inspection_requirements_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='design',
+            name='status',
+            field=models.CharField(choices=[('pending_analysis', 'Pending Analysis'), ('analysis_in_progress', 'Analysis In Progress'), ('analysis_complete', 'Analysis Complete'), ('analysis_failed', 'Analysis Failed'), ('quoted', 'Quoted'), ('ordered', 'Ordered')], default='pending_analysis', max_length=20),
+        ),
+    ]
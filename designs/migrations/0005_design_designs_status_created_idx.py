@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-08-30 13:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('designs', '0004_alter_design_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['status', '-created_at'], name='designs_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def add_gin_index(apps, schema_editor):
+    # inspection_requirements is stored as jsonb on PostgreSQL; a GIN index
+    # makes inspection_requirements__contains=['CMM'] style filters index
+    # scans instead of per-row JSON parses. SQLite (dev/test) has no GIN
+    # support, so this is a no-op there.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "Designs_inspection_requirements_gin" '
+        'ON "Designs" USING GIN ("inspection_requirements")'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "Designs_inspection_requirements_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('designs', '0005_design_designs_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_gin_index, drop_gin_index),
+    ]
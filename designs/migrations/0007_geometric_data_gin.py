@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def add_gin_index(apps, schema_editor):
+    # geometric_data is jsonb on PostgreSQL; a jsonb_path_ops GIN index
+    # serves containment queries (e.g. geometric_data__dfm_risks__contains)
+    # with a smaller index than the default jsonb_ops, at the cost of only
+    # supporting @> — which is all the analytic filters use. SQLite
+    # (dev/test) has no GIN support, so this is a no-op there.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "Designs_geometric_data_gin" '
+        'ON "Designs" USING GIN ("geometric_data" jsonb_path_ops)'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "Designs_geometric_data_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('designs', '0006_inspection_requirements_gin'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_gin_index, drop_gin_index),
+    ]
@@ -6,6 +6,7 @@ from django.utils.translation import gettext_lazy as _
 # From spec: CREATE TYPE design_status AS ENUM ('pending_analysis', 'analysis_complete', 'quoted', 'ordered');
 class DesignStatus(models.TextChoices):
     PENDING_ANALYSIS = 'pending_analysis', _('Pending Analysis')
+    ANALYSIS_IN_PROGRESS = 'analysis_in_progress', _('Analysis In Progress') # Claimed by a worker
     ANALYSIS_COMPLETE = 'analysis_complete', _('Analysis Complete')
     ANALYSIS_FAILED = 'analysis_failed', _('Analysis Failed') # New status
     QUOTED = 'quoted', _('Quoted')
@@ -72,3 +73,9 @@ class Design(models.Model):
         ordering = ['-created_at']
         # Django automatically creates an index on ForeignKey fields (like customer_id),
         # so CREATE INDEX idx_designs_customer_id ON Designs(customer_id); is covered.
+        indexes = [
+            # Workers and the admin filter by status and order by -created_at
+            # (the model default); the composite index turns that into an
+            # index range scan instead of a filter-then-sort.
+            models.Index(fields=['status', '-created_at'], name='designs_status_created_idx'),
+        ]
@@ -1,18 +1,86 @@
+import importlib
 import logging
+import mmap
 import os
 import tempfile
-from decimal import Decimal # For precise arithmetic
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from celery import shared_task
 from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
 from .models import Design, DesignStatus
 
 logger = logging.getLogger(__name__)
 
+# Large CAD files (STEP assemblies, high-resolution STLs) are downloaded with
+# parallel ranged GETs instead of one serial stream; below the threshold boto3
+# falls back to a plain single GET, so small files pay no extra overhead.
+#
+# Download concurrency deliberately stays on sync boto3 + transfer threads
+# rather than aioboto3/asyncio: Celery prefork workers already provide the
+# cross-design parallelism, each task is dominated by the CPU-bound parse
+# (which an event loop cannot overlap), and the threaded TransferConfig
+# saturates bandwidth within a single download. Revisit only if the worker
+# model moves to gevent/asyncio pools.
+_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+)
+
+# Process-wide S3 client. Building a boto3 client does endpoint discovery,
+# TLS setup and service-model loading (~100-300ms), which used to be paid on
+# every task invocation. Celery workers are process-local and boto3 clients
+# are thread-safe for API calls, so one lazily built client is shared.
+_S3_CLIENT = None
+_S3_CLIENT_LOCK = threading.Lock()
+
+
+# Process pool for OCP-backed STEP/IGES analysis. OpenCascade holds large
+# native heaps per shape and doesn't reliably release the GIL, so parses run
+# in separate processes: throughput scales across cores and
+# max_tasks_per_child recycles workers to clamp native memory growth.
+_CAD_POOL = None
+_CAD_POOL_LOCK = threading.Lock()
+
+
+def _get_cad_pool():
+    """Return the shared process pool for advanced CAD analysis."""
+    global _CAD_POOL
+    if _CAD_POOL is None:
+        with _CAD_POOL_LOCK:
+            if _CAD_POOL is None:
+                _CAD_POOL = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(), max_tasks_per_child=16
+                )
+    return _CAD_POOL
+
+
+def _get_s3_client():
+    """Return the shared S3 client, constructing it on first use."""
+    global _S3_CLIENT
+    if _S3_CLIENT is None:
+        with _S3_CLIENT_LOCK:
+            if _S3_CLIENT is None:
+                _S3_CLIENT = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_S3_REGION_NAME,
+                    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                    config=boto3.session.Config(signature_version=settings.AWS_S3_SIGNATURE_VERSION)
+                )
+    return _S3_CLIENT
+
 # Attempt to import numpy-stl
 try:
     import numpy
@@ -29,7 +97,12 @@ STEPUTILS_AVAILABLE = False
 try:
     from OCC.Extend.DataExchange import read_step_file, read_iges_file
     from OCC.Core.TopoDS import TopoDS_Shape
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
     from OCC.Core.BRepGProp import brepgprop
+    from OCC.Core.GeomAbs import (
+        GeomAbs_Plane, GeomAbs_Cylinder, GeomAbs_Cone, GeomAbs_Sphere,
+        GeomAbs_Torus, GeomAbs_BSplineSurface,
+    )
     from OCC.Core.GProp import GProp_GProps
     from OCC.Core.BRepBndLib import brepbndlib
     from OCC.Core.Bnd import Bnd_Box
@@ -42,6 +115,38 @@ except ImportError:
     logger.warning("pythonocc-core is not available. Advanced CAD analysis will be limited.")
 
 
+# Binary STL layout: 80-byte header, uint32 triangle count, then fixed
+# 50-byte records. Matches numpy-stl's Mesh dtype field names so the mapped
+# array can back a Mesh directly.
+_BINARY_STL_DTYPE = numpy.dtype([
+    ('normals', '<f4', (3,)),
+    ('vectors', '<f4', (3, 3)),
+    ('attr', '<u2', (1,)),
+]) if NUMPY_STL_AVAILABLE else None
+
+
+def _load_stl_mesh(file_path):
+    """Load an STL mesh, memory-mapping binary files zero-copy.
+
+    A binary STL is identified by its exact size (84-byte header plus
+    50 bytes per triangle); the triangle table is then viewed in place via
+    numpy.frombuffer instead of numpy-stl's general-purpose parser and its
+    many small reads. ASCII files fall back to ``Mesh.from_file``. The
+    mapped view is read-only, so normals are taken from the file rather
+    than recomputed.
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size >= 84:
+        with open(file_path, 'rb') as f:
+            header = f.read(84)
+            count = int(numpy.frombuffer(header[80:84], dtype='<u4')[0])
+            if file_size == 84 + count * 50:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                data = numpy.frombuffer(mm, dtype=_BINARY_STL_DTYPE, count=count, offset=84)
+                return stl_mesh.Mesh(data, calculate_normals=False)
+    return stl_mesh.Mesh.from_file(file_path)
+
+
 def perform_stl_analysis(file_path):
     """
     Performs CAD analysis on an STL file using numpy-stl.
@@ -55,65 +160,67 @@ def perform_stl_analysis(file_path):
     logger.info(f"STL Analysis: Starting for file {file_path}...")
 
     try:
-        main_mesh = stl_mesh.Mesh.from_file(file_path)
+        main_mesh = _load_stl_mesh(file_path)
     except Exception as e: # Catch broad exceptions from stl library loading
         logger.error(f"STL Analysis: Failed to load/parse STL file {file_path}: {e}")
         raise ValueError(f"Invalid or corrupt STL file: {os.path.basename(file_path)}") from e
 
-    # Volume: numpy-stl returns volume in units^3 of the STL file. Assuming mm^3.
-    # Convert to cm^3 (1 cm^3 = 1000 mm^3)
-    volume_mm3, _, _ = main_mesh.get_mass_properties()
-    volume_cm3 = abs(Decimal(str(volume_mm3))) / Decimal("1000.0")
+    # Volume: computed via the divergence theorem as the sum of signed
+    # tetrahedron volumes — one fused einsum/cross pass over the vertex
+    # arrays. get_mass_properties() would give the same figure but also
+    # computes the centre of gravity and inertia tensor we never use.
+    # STL units are assumed mm^3; convert to cm^3 (1 cm^3 = 1000 mm^3).
+    # Values are float64 throughout; rounding for JSON happens once at the
+    # end, so plain float arithmetic is enough.
+    v0, v1, v2 = main_mesh.v0, main_mesh.v1, main_mesh.v2
+    volume_mm3 = numpy.einsum('ij,ij->i', v0, numpy.cross(v1, v2)).sum() / 6.0
+    volume_cm3 = abs(float(volume_mm3)) / 1000.0
 
     # Bounding Box (bbox_mm): Get min/max extents and calculate dimensions.
     # mesh.min_ and mesh.max_ give [xmin, ymin, zmin] and [xmax, ymax, zmax]
-    min_coords = main_mesh.min_
-    max_coords = main_mesh.max_
-    bbox_mm = [
-        float(Decimal(str(max_coords[i])) - Decimal(str(min_coords[i]))) for i in range(3)
-    ]
-
-    # Surface Area: numpy-stl returns area in units^2. Assuming mm^2.
-    # Convert to cm^2 (1 cm^2 = 100 mm^2)
-    surface_area_mm2 = main_mesh.areas.sum()
-    surface_area_cm2 = Decimal(str(surface_area_mm2)) / Decimal("100.0")
+    bbox_mm = (main_mesh.max_ - main_mesh.min_).tolist()
+
+    # Surface Area: half the cross-product magnitudes of the edge vectors,
+    # again a single pass over arrays already in cache. Assuming mm^2;
+    # convert to cm^2 (1 cm^2 = 100 mm^2). The squared cross products are
+    # kept around — the prismatic check below reuses them.
+    cross = numpy.cross(v1 - v0, v2 - v0)
+    cross_sq = cross * cross
+    norm_sq = cross_sq.sum(axis=1) # |cross|^2 per face = (2 * area)^2
+    surface_area_mm2 = 0.5 * numpy.sqrt(norm_sq).sum()
+    surface_area_cm2 = float(surface_area_mm2) / 100.0
 
     # Complexity Score (heuristic: number of triangles / 10000, capped at 1.0)
     # This is a very basic heuristic. A more sophisticated score would be better.
     num_triangles = main_mesh.vectors.shape[0]
     logger.info(f"STL Analysis Debug: num_triangles={num_triangles}, vectors.shape={main_mesh.vectors.shape}")
-    complexity_score = min(Decimal(str(num_triangles)) / Decimal("10000.0"), Decimal("1.0"))
+    complexity_score = min(num_triangles / 10000.0, 1.0)
 
     # --- Manufacturing Concepts / DFM Analysis ---
     
     # 1. Prismatic vs Organic (Normal Vector Analysis)
-    # Check alignment of face normals with principal axes (X, Y, Z)
-    # numpy-stl normals are in main_mesh.normals
-    normals = main_mesh.normals
-    # Normalize vectors just in case (though stl usually has them normalized)
-    # We can use numpy for fast batch processing if available, which it is since we imported it.
-    
-    # Absolute dot products with axes. 
-    # Since we want to check if it aligns with ANY axis (X, Y, or Z), we look for components close to 1.0 or -1.0
-    # A perfectly prismatic part (cube) has normals like [1,0,0], [-1,0,0], [0,1,0]...
-    # So the max absolute component of the normal vector should be close to 1.0.
-    
-    abs_normals = numpy.abs(normals)
-    max_components = numpy.max(abs_normals, axis=1)
-    
-    # We define "aligned" as having a max component > 0.95 (approx 18 degrees tolerance)
-    aligned_mask = max_components > 0.95
-    aligned_faces_count = numpy.sum(aligned_mask)
-    total_faces = normals.shape[0]
-    
+    # Check alignment of face normals with principal axes (X, Y, Z).
+    # A perfectly prismatic part (cube) has normals like [1,0,0], [-1,0,0],
+    # [0,1,0]..., so the max absolute component of the unit normal should be
+    # close to 1.0. We define "aligned" as a max component > 0.95 (approx 18
+    # degrees tolerance).
+    #
+    # Rather than materializing main_mesh.normals and normalizing, reuse the
+    # squared edge cross products from the area pass: for unit normal n,
+    # |n_i| > 0.95 is exactly cross_i^2 > 0.95^2 * |cross|^2. That form is
+    # scale-invariant (no sqrt, abs or per-element division) and allocates
+    # nothing new beyond the comparison mask.
+    aligned_faces_count = int((cross_sq.max(axis=1) > 0.9025 * norm_sq).sum())
+    total_faces = cross_sq.shape[0]
+
     prismatic_score = float(aligned_faces_count) / float(total_faces) if total_faces > 0 else 0.0
     
     # 2. Thin Wall / Fragility Indicator
     # High Surface Area to Volume ratio usually indicates thin walls or complex lattice.
     # Sphere SA/Vol = 3/r. Cube SA/Vol = 6/s.
     # Heuristic: If SA (cm2) / Vol (cm3) > 10, it might be thin/fragile.
-    sa_vol_ratio = float(surface_area_cm2) / float(volume_cm3) if volume_cm3 > 0 else 0.0
-    
+    sa_vol_ratio = surface_area_cm2 / volume_cm3 if volume_cm3 > 0 else 0.0
+
     dfm_risks = []
     if sa_vol_ratio > 10.0:
         dfm_risks.append("High Surface-to-Volume Ratio (Potential Thin Walls)")
@@ -122,12 +229,12 @@ def perform_stl_analysis(file_path):
         dfm_risks.append("Organic/Contoured Geometry (Requires 3D Machining)")
 
     analysis_results = {
-        "volume_cm3": float(volume_cm3.quantize(Decimal("0.01"))), # Store as float after rounding
-        "bbox_mm": [float(Decimal(str(d)).quantize(Decimal("0.1"))) for d in bbox_mm],
-        "surface_area_cm2": float(surface_area_cm2.quantize(Decimal("0.01"))),
-        "complexity_score": float(complexity_score.quantize(Decimal("0.0001"))),
-        "prismatic_score": float(Decimal(str(prismatic_score)).quantize(Decimal("0.01"))),
-        "sa_vol_ratio": float(Decimal(str(sa_vol_ratio)).quantize(Decimal("0.01"))),
+        "volume_cm3": round(volume_cm3, 2),
+        "bbox_mm": [round(d, 1) for d in bbox_mm],
+        "surface_area_cm2": round(surface_area_cm2, 2),
+        "complexity_score": round(complexity_score, 4),
+        "prismatic_score": round(prismatic_score, 2),
+        "sa_vol_ratio": round(sa_vol_ratio, 2),
         "dfm_risks": dfm_risks,
         "num_triangles": num_triangles,
         "analysis_engine": f"numpy-stl-v{stl_mesh.VERSION if hasattr(stl_mesh, 'VERSION') else 'unknown'}"
@@ -135,6 +242,76 @@ def perform_stl_analysis(file_path):
     logger.info(f"STL Analysis: Completed for {file_path}. Results: {analysis_results}")
     return analysis_results
 
+def _face_metrics_occ(shape):
+    """Accumulate per-face metrics using OCC's C-backed iterators.
+
+    TopologyExplorer walks the faces via TopExp in C++, BRepAdaptor_Surface
+    classifies each face as an int enum, and brepgprop computes the area —
+    far fewer Python/C++ crossings than cadquery's per-face string
+    geomType()/Area() wrappers.
+
+    Returns (holes_count, curved_area, prismatic_area, total_area).
+    """
+    curved_types = (
+        GeomAbs_Cylinder, GeomAbs_Cone, GeomAbs_Sphere,
+        GeomAbs_Torus, GeomAbs_BSplineSurface,
+    )
+    prismatic_types = (GeomAbs_Plane, GeomAbs_Cylinder, GeomAbs_Cone)
+
+    holes_count = 0
+    curved_area = 0.0
+    prismatic_area = 0.0
+    total_area = 0.0
+    props = GProp_GProps()
+
+    for face in TopologyExplorer(shape).faces():
+        brepgprop.SurfaceProperties(face, props)
+        f_area = props.Mass()
+        surf_type = BRepAdaptor_Surface(face).GetType()
+        total_area += f_area
+
+        if surf_type in curved_types:
+            curved_area += f_area
+            if surf_type == GeomAbs_Cylinder:
+                holes_count += 1 # Same heuristic as the cadquery loop
+        if surf_type in prismatic_types:
+            prismatic_area += f_area
+
+    return holes_count, curved_area, prismatic_area, total_area
+
+
+def _load_step_model(cq, file_path):
+    """Load a STEP file, preferring a tuned STEPControl_Reader.
+
+    cq.importers.importStep runs full ShapeHealing with default transfer
+    parameters, which dominates import time on larger files. Quotation
+    analysis only needs volume/bbox/face types, so healing is switched off
+    and the read precision relaxed. Falls back to the stock importer when
+    the reader bindings are unavailable or the tuned read fails.
+    """
+    for binding in ("OCP", "OCC.Core"):
+        try:
+            IFSelect = importlib.import_module(f"{binding}.IFSelect")
+            Interface = importlib.import_module(f"{binding}.Interface")
+            STEPControl = importlib.import_module(f"{binding}.STEPControl")
+        except ImportError:
+            continue
+        try:
+            Interface.Interface_Static.SetIVal("read.step.shape.repair", 0)
+            Interface.Interface_Static.SetIVal("read.precision.mode", 0)
+            Interface.Interface_Static.SetRVal("read.precision.val", 0.01)
+
+            reader = STEPControl.STEPControl_Reader()
+            if reader.ReadFile(file_path) == IFSelect.IFSelect_RetDone:
+                reader.TransferRoots()
+                return cq.Workplane("XY").newObject([cq.Shape.cast(reader.OneShape())])
+            logger.warning(f"Tuned STEP reader could not read {file_path}; falling back to importStep.")
+        except Exception as e:
+            logger.warning(f"Tuned STEP read failed for {file_path} ({e}); falling back to importStep.")
+        break
+    return cq.importers.importStep(file_path)
+
+
 def perform_advanced_analysis(file_path, file_extension):
     """
     Performs advanced CAD analysis using CadQuery (which uses OCP/OpenCascade).
@@ -149,25 +326,24 @@ def perform_advanced_analysis(file_path, file_extension):
     logger.info(f"Advanced Analysis: Starting for {file_path}...")
 
     try:
-        # Load the model
-        # CadQuery importers infer format from extension or content
-        model = cq.importers.importStep(file_path)
+        # Load the model via the tuned reader (healing off), falling back to
+        # the general cadquery importer.
+        model = _load_step_model(cq, file_path)
     except Exception as e:
         logger.error(f"Failed to load STEP file {file_path}: {e}")
         raise ValueError(f"Invalid STEP file: {e}")
 
     # --- Geometric Properties ---
+    # Resolve the underlying solid once; every model.val() call re-walks the
+    # CadQuery object stack.
+    solid = model.val()
+
     # Volume
-    volume_mm3 = model.val().Volume()
+    volume_mm3 = solid.Volume()
     volume_cm3 = volume_mm3 / 1000.0
 
-    # Bounding Box
-    bb = model.val().BoundingBox()
-    bbox_mm = [bb.xlen, bb.ylen, bb.zlen]
-    
-    # Stock Volume (Volume of the bounding box)
-    # Default AABB
-    bb = model.val().BoundingBox()
+    # Bounding Box / Stock Volume (Volume of the bounding box, default AABB)
+    bb = solid.BoundingBox()
     bbox_mm = [bb.xlen, bb.ylen, bb.zlen]
     stock_volume_mm3 = bb.xlen * bb.ylen * bb.zlen
     
@@ -176,7 +352,7 @@ def perform_advanced_analysis(file_path, file_extension):
     # This often (but not always) minimizes the AABB.
     try:
         # Calculate properties
-        props = model.val().PrincipalProperties()
+        props = solid.PrincipalProperties()
         
         # Create a transformation to align principal axes to global axes
         # OCP/CQ doesn't have a one-line "align to principal" for the shape itself easily exposed in high-level CQ
@@ -230,27 +406,46 @@ def perform_advanced_analysis(file_path, file_extension):
     optimal_stock_volume_cm3 = optimal_stock_volume_mm3 / 1000.0
 
     # Surface Area
-    surface_area_mm2 = model.val().Area()
+    surface_area_mm2 = solid.Area()
     surface_area_cm2 = surface_area_mm2 / 100.0
 
-    # --- Feature Detection ---
-    
-    # 1. Holes (Cylindrical faces)
-    # Heuristic: Find faces that are cylinders
-    faces = model.faces().vals()
-    holes_count = 0
-    curved_area_mm2 = 0.0
-
-    for face in faces:
-        geom_type = face.geomType()
-        if geom_type in ["CYLINDER", "CONE", "SPHERE", "TORUS", "BSPLINE"]:
-            curved_area_mm2 += face.Area()
-            
-            # Simple hole detection: Cylinder + Inner wire? 
-            # Or just count cylindrical faces that are "inner"
-            # For now, let's count vertical-ish cylinders as potential holes
-            if geom_type == "CYLINDER":
-                 holes_count += 1 # Very basic heuristic, counts every cylindrical face
+    # --- Feature Detection (single pass over the B-Rep faces) ---
+    # Prefer the OCC fast path: C-backed face iteration and int-enum surface
+    # classification instead of cadquery's per-face string wrappers. Fall
+    # back to the cadquery loop when pythonocc-core is not importable.
+    face_metrics = None
+    if PYTHONOCC_AVAILABLE:
+        try:
+            face_metrics = _face_metrics_occ(solid.wrapped)
+        except Exception as e:
+            logger.warning(f"OCC face iteration failed ({e}); falling back to cadquery face loop.")
+
+    if face_metrics is not None:
+        holes_count, curved_area_mm2, prismatic_area, total_area = face_metrics
+    else:
+        holes_count = 0
+        curved_area_mm2 = 0.0
+        prismatic_area = 0.0
+        total_area = 0.0
+
+        for face in model.faces().vals():
+            f_area = face.Area()
+            geom_type = face.geomType()
+            total_area += f_area
+
+            if geom_type in ["CYLINDER", "CONE", "SPHERE", "TORUS", "BSPLINE"]:
+                curved_area_mm2 += f_area
+
+                # Simple hole detection: Cylinder + Inner wire?
+                # Or just count cylindrical faces that are "inner"
+                # For now, let's count vertical-ish cylinders as potential holes
+                if geom_type == "CYLINDER":
+                    holes_count += 1 # Very basic heuristic, counts every cylindrical face
+
+            # PLANE = Prismatic. CYLINDER/CONE = Simple Prismatic.
+            # BSPLINE/TORUS/SPHERE = Organic/Complex.
+            if geom_type in ["PLANE", "CYLINDER", "CONE"]:
+                prismatic_area += f_area
 
     # Refine hole count: usually a hole has 1 cylindrical face (if through) or more.
     # Let's assume holes_count is roughly the number of cylindrical features.
@@ -265,24 +460,9 @@ def perform_advanced_analysis(file_path, file_extension):
     complexity_score = min(removal_ratio / 10.0, 1.0) # Normalize somewhat
 
     # --- Manufacturing Concepts / DFM Analysis ---
-    
+
     # 1. Prismatic vs Organic (Face Type Analysis)
-    # In STEP/Brep, we can check the type of faces.
-    # PLANE = Prismatic. CYLINDER/CONE = Simple Prismatic. 
-    # BSPLINE/TORUS/SPHERE = Organic/Complex.
-    
-    prismatic_area = 0.0
-    total_area = 0.0
-    
-    faces = model.faces().vals()
-    for face in faces:
-        f_area = face.Area()
-        total_area += f_area
-        geom_type = face.geomType()
-        
-        if geom_type in ["PLANE", "CYLINDER", "CONE"]:
-            prismatic_area += f_area
-            
+    # prismatic_area and total_area were accumulated in the face pass above.
     prismatic_score = prismatic_area / total_area if total_area > 0 else 0.0
     
     # 2. Thin Wall Indicator
@@ -327,6 +507,11 @@ def analyze_cad_file(self, design_id):
     in the `geometric_data` field of the Design model. The design's status
     is updated to ANALYSIS_COMPLETE or ANALYSIS_FAILED.
 
+    The work is split into phases so no row lock is held across the
+    multi-second download/parse: a short claiming transaction flips the
+    status to ANALYSIS_IN_PROGRESS, the download and analysis run outside
+    any transaction, and the result is committed in a final short write.
+
     Args:
         design_id (UUID): The primary key of the Design object to analyze.
 
@@ -334,112 +519,174 @@ def analyze_cad_file(self, design_id):
         str: A message indicating the outcome of the analysis.
     """
     logger.info(f"Celery Task: Starting CAD analysis for Design ID: {design_id}")
+
+    # Phase 1: claim the row. The lock only covers this short transaction,
+    # so concurrent writers (and workers processing other designs) are not
+    # blocked behind the download + parse below.
     try:
-        with transaction.atomic(): # Ensure DB operations are atomic for this task instance
-            # Fetch the design object safely, ensuring it's not processed if status changed
+        with transaction.atomic():
             design = Design.objects.select_for_update().get(id=design_id)
 
             if design.status != DesignStatus.PENDING_ANALYSIS:
                 logger.warning(f"Design ID {design_id} is not in PENDING_ANALYSIS status (current: {design.status}). Skipping analysis.")
                 return f"Skipped: Design {design_id} not in PENDING_ANALYSIS status."
 
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_S3_REGION_NAME,
-                endpoint_url=settings.AWS_S3_ENDPOINT_URL,
-                config=boto3.session.Config(signature_version=settings.AWS_S3_SIGNATURE_VERSION)
-            )
-
-            # Create a temporary file to download the S3 object
-            # tempfile.NamedTemporaryFile ensures the file is deleted when closed.
-            with tempfile.NamedTemporaryFile(delete=True, suffix=os.path.splitext(design.s3_file_key)[1]) as tmp_file:
-                local_file_path = tmp_file.name
-                logger.info(f"Downloading s3://{settings.AWS_STORAGE_BUCKET_NAME}/{design.s3_file_key} to {local_file_path}")
+            design.status = DesignStatus.ANALYSIS_IN_PROGRESS
+            # updated_at is auto_now and must be listed for it to refresh.
+            design.save(update_fields=['status', 'updated_at'])
+    except Design.DoesNotExist:
+        logger.error(f"Design ID {design_id} not found in database for analysis.")
+        # No retry if design doesn't exist
+        return f"Failed: Design {design_id} not found."
 
+    # Phase 2: download and analyse with no transaction open.
+    try:
+        s3_client = _get_s3_client()
+
+        # One C-level scan of the key, reused for the tempfile suffix and
+        # the dispatch below. A tail that is empty or still contains '/'
+        # means the key has no real extension (no dot, or the only dot is
+        # in a directory) — fall back to '' like splitext would, so the
+        # dispatch reports an unsupported file type instead of
+        # NamedTemporaryFile choking on the bogus suffix.
+        extension_tail = design.s3_file_key.rpartition('.')[-1].lower()
+        if not extension_tail or '/' in extension_tail:
+            file_extension = ''
+        else:
+            file_extension = '.' + extension_tail
+
+        # cadquery's first import costs seconds on a cold worker; kick it off
+        # in a background thread so it overlaps the S3 download instead of
+        # running strictly after it.
+        warmup_future = None
+        if file_extension in ['.step', '.stp', '.iges', '.igs']:
+            warmup_executor = ThreadPoolExecutor(max_workers=1)
+            warmup_future = warmup_executor.submit(importlib.import_module, 'cadquery')
+            warmup_executor.shutdown(wait=False)
+
+        # Create a temporary file to download the S3 object
+        # tempfile.NamedTemporaryFile ensures the file is deleted when closed.
+        with tempfile.NamedTemporaryFile(delete=True, suffix=file_extension) as tmp_file:
+            local_file_path = tmp_file.name
+            logger.info(f"Downloading s3://{settings.AWS_STORAGE_BUCKET_NAME}/{design.s3_file_key} to {local_file_path}")
+
+            download_started = time.perf_counter()
+            try:
+                s3_client.download_file(
+                    settings.AWS_STORAGE_BUCKET_NAME, design.s3_file_key, local_file_path,
+                    Config=_S3_TRANSFER_CONFIG
+                )
+                logger.info(f"Successfully downloaded {design.s3_file_key}.")
+            except ClientError as e:
+                if e.response['Error']['Code'] == '404':
+                    logger.error(f"S3 file not found for Design ID {design_id}: s3://{settings.AWS_STORAGE_BUCKET_NAME}/{design.s3_file_key}")
+                    design.status = DesignStatus.ANALYSIS_FAILED # Or a more specific error status
+                    design.geometric_data = {"error": "S3 file not found."}
+                    design.save(update_fields=['status', 'geometric_data', 'updated_at'])
+                    # Do not retry for 404 as file won't appear magically
+                    return f"Failed: S3 file not found for Design {design_id}."
+                else:
+                    logger.error(f"S3 ClientError downloading file for Design ID {design_id}: {e}")
+                    # Retry for other S3 client errors (e.g., network issues)
+                    raise self.retry(exc=e) from e
+
+            # --- Perform CAD Analysis ---
+            if warmup_future is not None:
                 try:
-                    s3_client.download_file(settings.AWS_STORAGE_BUCKET_NAME, design.s3_file_key, local_file_path)
-                    logger.info(f"Successfully downloaded {design.s3_file_key}.")
-                except ClientError as e:
-                    if e.response['Error']['Code'] == '404':
-                        logger.error(f"S3 file not found for Design ID {design_id}: s3://{settings.AWS_STORAGE_BUCKET_NAME}/{design.s3_file_key}")
-                        design.status = DesignStatus.ANALYSIS_FAILED # Or a more specific error status
-                        design.geometric_data = {"error": "S3 file not found."}
-                        design.save()
-                        # Do not retry for 404 as file won't appear magically
-                        return f"Failed: S3 file not found for Design {design_id}."
+                    warmup_future.result()
+                except ImportError:
+                    pass # perform_advanced_analysis reports the missing dependency
+            download_ms = (time.perf_counter() - download_started) * 1000.0
+            geometric_data = {}
+            analysis_successful = False
+            error_message = None
+            parse_started = time.perf_counter()
+
+            try:
+                if file_extension == '.stl':
+                    if NUMPY_STL_AVAILABLE:
+                        geometric_data = perform_stl_analysis(local_file_path)
+                        analysis_successful = True
                     else:
-                        logger.error(f"S3 ClientError downloading file for Design ID {design_id}: {e}")
-                        # Retry for other S3 client errors (e.g., network issues)
-                        raise self.retry(exc=e) from e
-
-                # --- Perform CAD Analysis ---
-                file_extension = os.path.splitext(design.s3_file_key)[1].lower()
-                geometric_data = {}
-                analysis_successful = False
-                error_message = None
-
-                try:
-                    if file_extension == '.stl':
-                        if NUMPY_STL_AVAILABLE:
-                            geometric_data = perform_stl_analysis(local_file_path)
-                            analysis_successful = True
-                        else:
-                            error_message = "STL processing library (numpy-stl) not available."
-
-                    elif file_extension in ['.step', '.stp', '.iges', '.igs']:
-                        # Try advanced analysis first
+                        error_message = "STL processing library (numpy-stl) not available."
+
+                elif file_extension in ['.step', '.stp', '.iges', '.igs']:
+                    # Try advanced analysis first, in the CAD process pool so
+                    # OCP's native memory stays out of this worker. Fall back
+                    # to an in-process run where a pool can't be spawned
+                    # (e.g. inside daemonized prefork children).
+                    try:
                         try:
+                            geometric_data = _get_cad_pool().submit(
+                                perform_advanced_analysis, local_file_path, file_extension
+                            ).result()
+                        except (BrokenProcessPool, AssertionError, OSError) as pool_exc:
+                            logger.warning(f"CAD process pool unavailable ({pool_exc}); running analysis in-process.")
                             geometric_data = perform_advanced_analysis(local_file_path, file_extension)
-                            analysis_successful = True
-                        except Exception as e:
-                            error_message = f"Advanced analysis failed: {e}"
-                            logger.error(error_message)
-                    else:
-                        error_message = f"Unsupported file type: {file_extension}."
-
-                    if analysis_successful:
-                        design.geometric_data = geometric_data
-                        design.status = DesignStatus.ANALYSIS_COMPLETE
-                        logger.info(f"CAD analysis successful for Design ID: {design_id}. Status set to ANALYSIS_COMPLETE.")
-                    else:
-                        design.status = DesignStatus.ANALYSIS_FAILED
-                        design.geometric_data = {"error": error_message or "Unknown analysis error."}
-
-                except ValueError as ve:
-                    logger.error(f"CAD analysis failed for Design ID {design_id}: {ve}")
-                    design.status = DesignStatus.ANALYSIS_FAILED
-                    design.geometric_data = {"error": f"Analysis failed: {str(ve)}"}
-                except RuntimeError as rte:
-                     logger.error(f"CAD analysis runtime error for Design ID {design_id}: {rte}")
-                     design.status = DesignStatus.ANALYSIS_FAILED
-                     design.geometric_data = {"error": f"Analysis runtime error: {str(rte)}"}
-                except Exception as analysis_exc:
-                    logger.error(f"Unexpected CAD analysis error for Design ID {design_id}: {analysis_exc}")
+                        analysis_successful = True
+                    except Exception as e:
+                        error_message = f"Advanced analysis failed: {e}"
+                        logger.error(error_message)
+                else:
+                    error_message = f"Unsupported file type: {file_extension}."
+
+                if analysis_successful:
+                    design.geometric_data = geometric_data
+                    design.status = DesignStatus.ANALYSIS_COMPLETE
+                    logger.info(f"CAD analysis successful for Design ID: {design_id}. Status set to ANALYSIS_COMPLETE.")
+                else:
                     design.status = DesignStatus.ANALYSIS_FAILED
-                    design.geometric_data = {"error": f"Unexpected analysis error: {str(analysis_exc)}"}
-                finally:
-                    design.save() # Ensure status and geometric_data are saved
+                    design.geometric_data = {"error": error_message or "Unknown analysis error."}
+
+            except ValueError as ve:
+                logger.error(f"CAD analysis failed for Design ID {design_id}: {ve}")
+                design.status = DesignStatus.ANALYSIS_FAILED
+                design.geometric_data = {"error": f"Analysis failed: {str(ve)}"}
+            except RuntimeError as rte:
+                logger.error(f"CAD analysis runtime error for Design ID {design_id}: {rte}")
+                design.status = DesignStatus.ANALYSIS_FAILED
+                design.geometric_data = {"error": f"Analysis runtime error: {str(rte)}"}
+            except Exception as analysis_exc:
+                logger.error(f"Unexpected CAD analysis error for Design ID {design_id}: {analysis_exc}")
+                design.status = DesignStatus.ANALYSIS_FAILED
+                design.geometric_data = {"error": f"Unexpected analysis error: {str(analysis_exc)}"}
+            finally:
+                # Phase 3: commit the result. A single save is its own short
+                # transaction; no lock was held while analysing. Only the
+                # mutated columns are written — a full save would rewrite
+                # all 15+ columns including the geometric_data JSON.
+                save_started = time.perf_counter()
+                if analysis_successful:
+                    # Common case: one filtered UPDATE, skipping full model
+                    # save machinery and signals. auto_now doesn't fire on
+                    # queryset updates, so updated_at is set explicitly.
+                    Design.objects.filter(pk=design_id).update(
+                        status=design.status,
+                        geometric_data=design.geometric_data,
+                        updated_at=timezone.now(),
+                    )
+                else:
+                    design.save(update_fields=['status', 'geometric_data', 'updated_at'])
+                save_ms = (time.perf_counter() - save_started) * 1000.0
+                # Per-phase breakdown: tells us whether a slow invocation was
+                # bound by S3, the CAD parse, or the DB write.
+                logger.info(
+                    "CAD analysis timing for Design ID %s: "
+                    '{"download_ms": %.1f, "parse_ms": %.1f, "save_ms": %.1f}',
+                    design_id, download_ms,
+                    (save_started - parse_started) * 1000.0, save_ms,
+                )
+
+        logger.info(f"Successfully processed Design ID: {design_id}. Final status: {design.status}")
+        return f"Successfully processed Design ID: {design_id}. Final status: {design.status}"
 
-            logger.info(f"Successfully processed Design ID: {design_id}. Final status: {design.status}")
-            return f"Successfully processed Design ID: {design_id}. Final status: {design.status}"
-
-    except Design.DoesNotExist:
-        logger.error(f"Design ID {design_id} not found in database for analysis.")
-        # No retry if design doesn't exist
-        return f"Failed: Design {design_id} not found."
     except Exception as e:
         logger.error(f"Unexpected error in analyze_cad_file task for Design ID {design_id}: {e}")
+        # Release the claim so the retry (or a later re-dispatch) isn't
+        # skipped as already in progress.
+        Design.objects.filter(
+            id=design_id, status=DesignStatus.ANALYSIS_IN_PROGRESS
+        ).update(status=DesignStatus.PENDING_ANALYSIS)
         # Retry for other unexpected errors
         # The 'self' (bound task instance) is used for retry
-        # Ensure that the design status reflects a pending or error state if retrying
-        try:
-            # Attempt to update status to reflect error before retry, if possible
-            design_to_update = Design.objects.get(id=design_id)
-            if design_to_update.status not in [DesignStatus.ANALYSIS_COMPLETE, DesignStatus.ANALYSIS_FAILED]:
-                 # Update to ANALYSIS_FAILED or keep PENDING_ANALYSIS with an error note if desired
-                pass # For now, rely on retry and eventual failure if persistent
-        except Design.DoesNotExist:
-            pass # Design was deleted or never existed
         raise self.retry(exc=e) from e
@@ -106,7 +106,6 @@ class DesignAPITests(APITestCase):
         self.assertTrue(response.data["s3Key"].endswith(".stl"))
 
         # Check that boto3.client was called with expected AWS settings
-        # Check that boto3.client was called
         self.assertEqual(mock_boto_client_constructor.call_count, 1)
         # Get the actual call arguments
         args, kwargs = mock_boto_client_constructor.call_args
@@ -382,16 +381,16 @@ class DesignAnalysisTaskTests(APITestCase):
 
     def _mock_s3_download_file(self, s3_client_mock, source_file_path=SAMPLE_STL_FILE_PATH):
         """Helper to mock the S3 download_file to copy a local sample file."""
-        def copier(Bucket, Key, TargetFilePath):
+        def copier(Bucket, Key, TargetFilePath, Config=None):
             shutil.copy(source_file_path, TargetFilePath)
         s3_client_mock.download_file.side_effect = copier
         return s3_client_mock
 
-    @patch('designs.tasks.boto3.client')
-    def test_analyze_cad_file_task_success_stl(self, mock_boto_client_constructor):
+    @patch('designs.tasks._get_s3_client')
+    def test_analyze_cad_file_task_success_stl(self, mock_get_s3_client):
         mock_s3_instance = MagicMock()
         self._mock_s3_download_file(mock_s3_instance, SAMPLE_STL_FILE_PATH)
-        mock_boto_client_constructor.return_value = mock_s3_instance
+        mock_get_s3_client.return_value = mock_s3_instance
 
         result_message = analyze_cad_file(self.design_pending_stl.id)
 
@@ -412,14 +411,14 @@ class DesignAnalysisTaskTests(APITestCase):
         self.assertIn("Successfully processed", result_message)
         mock_s3_instance.download_file.assert_called_once()
 
-    @patch('designs.tasks.boto3.client')
-    def test_analyze_cad_file_task_s3_download_404(self, mock_boto_client_constructor):
+    @patch('designs.tasks._get_s3_client')
+    def test_analyze_cad_file_task_s3_download_404(self, mock_get_s3_client):
         mock_s3_instance = MagicMock()
         mock_s3_instance.download_file.side_effect = ClientError(
             {'Error': {'Code': '404', 'Message': 'Not Found'}},
             'download_file'
         )
-        mock_boto_client_constructor.return_value = mock_s3_instance
+        mock_get_s3_client.return_value = mock_s3_instance
 
         result_message = analyze_cad_file(self.design_pending_stl.id)
 
@@ -429,12 +428,12 @@ class DesignAnalysisTaskTests(APITestCase):
         self.assertIn("S3 file not found", self.design_pending_stl.geometric_data["error"])
         self.assertIn("S3 file not found", result_message)
 
-    @patch('designs.tasks.boto3.client')
+    @patch('designs.tasks._get_s3_client')
     @patch('designs.tasks.stl_mesh.Mesh.from_file') # Patch the from_file method of numpy-stl
-    def test_analyze_cad_file_task_stl_parsing_error(self, mock_stl_from_file, mock_boto_client_constructor):
+    def test_analyze_cad_file_task_stl_parsing_error(self, mock_stl_from_file, mock_get_s3_client):
         mock_s3_instance = MagicMock()
         self._mock_s3_download_file(mock_s3_instance, SAMPLE_STL_FILE_PATH) # Download will "succeed"
-        mock_boto_client_constructor.return_value = mock_s3_instance
+        mock_get_s3_client.return_value = mock_s3_instance
 
         mock_stl_from_file.side_effect = ValueError("Simulated STL parsing error")
 
@@ -445,15 +444,15 @@ class DesignAnalysisTaskTests(APITestCase):
         self.assertIn("error", self.design_pending_stl.geometric_data)
         self.assertIn("Analysis failed: Invalid or corrupt STL file", self.design_pending_stl.geometric_data["error"])
 
-    @patch('designs.tasks.boto3.client')
-    def test_analyze_cad_file_task_unsupported_file_type(self, mock_boto_client_constructor):
+    @patch('designs.tasks._get_s3_client')
+    def test_analyze_cad_file_task_unsupported_file_type(self, mock_get_s3_client):
         mock_s3_instance = MagicMock()
         # Create a dummy .txt file for download simulation
         # For this test, the content doesn't matter as much as the extension check.
         # We can simulate the download of a file named 'unsupported.txt'.
         # The S3 key in self.design_pending_unsupported already has .txt extension.
         self._mock_s3_download_file(mock_s3_instance, SAMPLE_STL_FILE_PATH) # Content doesn't matter, path is just placeholder
-        mock_boto_client_constructor.return_value = mock_s3_instance
+        mock_get_s3_client.return_value = mock_s3_instance
 
         analyze_cad_file(self.design_pending_unsupported.id)
 
@@ -159,6 +159,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Tests use an in-memory database so they never touch disk. This is
+        # already the SQLite backend's default, but keep it explicit so a
+        # future move to Postgres remembers to provide an equivalent
+        # (UNLOGGED tables / fsync=off in the test container).
+        "TEST": {
+            "NAME": ":memory:",
+        },
     }
 }
 
@@ -241,6 +248,18 @@ import sys
 if 'test' in sys.argv or 'pytest' in sys.argv:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
+    # Argon2/PBKDF2 hashing dominates auth-test wall time and has no
+    # security value in tests; MD5 makes create_user/login effectively free.
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Fail tests on N+1 query patterns (per-row lazy loads of related
+    # objects) so missing select_related/prefetch_related shows up here
+    # instead of in production latency.
+    try:
+        import zeal  # noqa: F401
+        MIDDLEWARE = ['zeal.middleware.zeal_middleware'] + MIDDLEWARE
+        ZEAL_RAISE = True
+    except ImportError:
+        pass
 
 # Razorpay Configuration
 RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_YOUR_KEY_ID')